@@ -18,8 +18,6 @@ import os
 
 import sphinx_rtd_theme
 
-import git
-
 # If extensions (or modules to document with autodoc) are in another directory,
 # add these directories to sys.path here. If the directory is relative to the
 # documentation root, use os.path.abspath to make it absolute, like shown here.
@@ -90,9 +88,36 @@ copyright = u'2023-2024, ' + Affiliation
 # # This only works after the project is installed, i.e. will not work when building docs on readthedocs
 # version = open(os.path.join('..', 'lclib', '_version.py')).readlines()[1]
 
-# This requires an additional module: gitpython
-repo    = git.Repo(search_parent_directories=True)
-version = repo.git.rev_parse(repo.head, short=True)
+# Read directly from the .git directory (no need for git or gitpython)
+def git_short_sha():
+    """
+    Return the short hash of the current commit, following one 'ref:' indirection
+    from .git/HEAD to the branch file, or to packed-refs if the branch is packed.
+    """
+    git_dir = os.path.join(os.path.abspath('..'), '.git')
+    try:
+        with open(os.path.join(git_dir, 'HEAD')) as f:
+            head = f.read().strip()
+        if not head.startswith('ref:'):
+            # Detached HEAD
+            return head[:7]
+        ref = head[4:].strip()
+        try:
+            with open(os.path.join(git_dir, ref)) as f:
+                return f.read().strip()[:7]
+        except FileNotFoundError:
+            with open(os.path.join(git_dir, 'packed-refs')) as f:
+                for line in f:
+                    if line.rstrip().endswith(' ' + ref):
+                        return line[:7]
+    except OSError:
+        pass
+    return 'unknown'
+
+# Sphinx stores version/release in the environment pickle, so a value that changes with every
+# commit would invalidate all cached doctrees. Keep them stable (the RTD version name, or 'dev')
+# and only put the commit hash in html_title, which triggers a rewrite but not a re-read.
+version = os.environ.get('READTHEDOCS_VERSION', 'dev')
 
 release = version
 
@@ -142,14 +167,6 @@ pygments_style = 'sphinx'
 html_theme = 'sphinx_rtd_theme'
 html_theme_path = [sphinx_rtd_theme.get_html_theme_path()]
 
-# on_rtd is whether we are on readthedocs.org
-on_rtd = os.environ.get('READTHEDOCS', None) == 'True'
-
-if not on_rtd:  # only import and set the theme if we're building docs locally
-    import sphinx_rtd_theme
-    html_theme = 'sphinx_rtd_theme'
-    html_theme_path = [sphinx_rtd_theme.get_html_theme_path()]
-
 # Theme options are theme-specific and customize the look and feel of a theme
 # further.  For a list of options available for each theme, see the
 # documentation.
@@ -160,7 +177,7 @@ if not on_rtd:  # only import and set the theme if we're building docs locally
 
 # The name for this set of Sphinx documents.  If None, it defaults to
 # "<project> v<release> documentation".
-#html_title = None
+html_title = u'%s %s (%s) documentation' % (project, release, git_short_sha())
 
 # A shorter title for the navigation bar.  Default is the same as html_title.
 #html_short_title = None
@@ -316,156 +333,13 @@ texinfo_documents = [
 
 # -- Options for Texinfo output -------------------------------------------
 # http://www.sphinx-doc.org/en/master/usage/extensions/autodoc.html#confval-autodoc_mock_imports
-# autodoc_mock_imports = ['numpy', 
-#                         'cython', 
-#                         'h5py', 
-#                         'napari', 
-#                         'rpyc', 
-#                         'zmq', 
-#                         'signal', 
-#                         'logging', 
-#                         'select',
-#                         'atexit', 
-#                         'errno',] 
-
-autodoc_mock_imports = ['wcwidth',
-                        'snowballstemmer',
-                        'pytz',
-                        'PyOpenGL',
-                        'pure-eval',
-                        'ptyprocess',
-                        'heapdict',
-                        'appdirs',
-                        'wrapt',
-                        'urllib3',
-                        'tzdata',
-                        'typing-extensions',
-                        'traitlets',
-                        'tqdm',
-                        'tornado',
-                        'toolz',
-                        'tomli-w',
-                        'tabulate',
-                        'sphinxcontrib-serializinghtml',
-                        'sphinxcontrib-qthelp',
-                        'sphinxcontrib-jsmath',
-                        'sphinxcontrib-htmlhelp',
-                        'sphinxcontrib-devhelp',
-                        'sphinxcontrib-applehelp',
-                        'six',
-                        'shellingham',
-                        'rpds-py',
-                        'pyzmq',
-                        'PyYAML',
-                        'pyproject_hooks',
-                        'pygments',
-                        'psygnal',
-                        'psutil',
-                        'prompt-toolkit',
-                        'plumbum',
-                        'platformdirs',
-                        'Pillow',
-                        'pexpect',
-                        'parso',
-                        'packaging',
-                        'numpy',
-                        'networkx',
-                        'nest-asyncio',
-                        'napari-plugin-engine',
-                        'mdurl',
-                        'MarkupSafe',
-                        'locket',
-                        'lazy-loader',
-                        'kiwisolver',
-                        'in-n-out',
-                        'imagesize',
-                        'idna',
-                        'hsluv',
-                        'fsspec',
-                        'freetype-py',
-                        'executing',
-                        'docutils',
-                        'docstring-parser',
-                        'decorator',
-                        'debugpy',
-                        'cython',
-                        'cloudpickle',
-                        'click',
-                        'charset-normalizer',
-                        'certifi',
-                        'cachey',
-                        'babel',
-                        'attrs',
-                        'appnope',
-                        'annotated-types',
-                        'alabaster',
-                        'zmq',
-                        'vispy',
-                        'tifffile',
-                        'scipy',
-                        'rpyc',
-                        'rpyc.core',
-                        'rpyc.core.vinegar',
-                        'requests',
-                        'referencing',
-                        'qtpy',
-                        'python-dateutil',
-                        'pydantic-core',
-                        'pint',
-                        'partd',
-                        'matplotlib-inline',
-                        'markdown-it-py',
-                        'jupyter-core',
-                        'Jinja2',
-                        'jedi',
-                        'imageio',
+# Third-party packages imported by lclib that are not installed with envs/requirements-doc.txt
+# (their own dependencies are never imported once they are mocked)
+autodoc_mock_imports = ['click',
                         'h5py',
-                        'comm',
-                        'build',
-                        'asttokens',
-                        'superqt',
-                        'stack-data',
-                        'sphinx',
-                        'scikit-image',
-                        'rich',
-                        'pydantic',
-                        'pyconify',
-                        'pooch',
-                        'pandas',
-                        'napari-svg',
-                        'jupyter-client',
-                        'jsonschema-specifications',
-                        'dask',
-                        'typer',
-                        'pydantic-compat',
-                        'numpydoc',
-                        'jsonschema',
-                        'IPython',
-                        'npe2',
-                        'magicgui',
-                        'ipykernel',
-                        'app-model',
-                        'qtconsole',
-                        'napari-console',
                         'napari',
-                        'labcontrol-lib',
-                        'numpy', 
-                        'cython', 
-                        'h5py', 
-                        'napari', 
                         'napari_tools_menu',
-                        'zmq', 
-                        'signal', 
-                        'logging', 
-                        'select',
-                        'atexit', 
-                        'errno',
+                        'numpy',
+                        'qtpy',
+                        'zmq',
                         ]
-
-# Mock a dictionary
-from unittest.mock import Mock
-from rpyc.core.vinegar import _generic_exceptions_cache
-
-blah = Mock()
-blah.__getitem__ = Mock()
-blah.__getitem__.side_effect = _generic_exceptions_cache.__getitem__
\ No newline at end of file
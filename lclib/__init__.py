@@ -63,6 +63,8 @@ import subprocess
 
 _driver_classes = {}   # Dictionary for driver classes (populated through @register_driver when drivers module load)
 _motor_classes = {}   # Dictionary for motor classes (populated when drivers module load)
+_camera_classes = {}   # Subset of _driver_classes that are CameraBase subclasses (populated by camera.py)
+_register_hooks = []   # Functions called with (driver_name, cls) for every class passed to register_driver
 drivers = {}   # Dictionary for driver instances
 motors = {}    # Dictionary of motor instances
 
@@ -131,6 +133,10 @@ def register_driver(cls):
     # Store class into dict
     driver_name = cls.__name__.lower()
     _driver_classes[driver_name] = cls
+
+    # Let modules keep track of specific kinds of drivers (e.g. cameras)
+    for hook in _register_hooks:
+        hook(driver_name, cls)
     return cls
 
 def init(lab_name,
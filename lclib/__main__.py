@@ -5,16 +5,14 @@ This file is part of lab-control-lib
 (c) 2023-2024 Pierre Thibault (pthibault@units.it)
 """
 
-import time
 import sys
 import os
 import click
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
-from . import get_config, client_or_None, _driver_classes, LOG_DIR
-from .camera import CameraBase
+from . import get_config, client_or_None, _driver_classes, _camera_classes, LOG_DIR
 from .logs import logging_muted, log_to_file, logger as rootlogger
-from . import ui
 
 config = get_config()
 
@@ -25,56 +23,69 @@ this_host = config['this_host']
 DEVICE_ADDRESSES = {name: cls.Server.ADDRESS for name, cls in _driver_classes.items()}
 
 # List of devices that can run on this host
-local_ip_list = config['local_ip_list']
-AVAILABLE = [name for name, address in DEVICE_ADDRESSES.items() if address[0] in local_ip_list]
+local_ip_set = frozenset(config['local_ip_list'])
+AVAILABLE = frozenset(name for name, address in DEVICE_ADDRESSES.items() if address[0] in local_ip_set)
 
-# List Camera devices
-CAMERAS = {name: cls for name, cls in _driver_classes.items() if issubclass(cls, CameraBase)}
 
+class LogLevel(click.ParamType):
+    """
+    A log level given either as a number or as a level name.
+    """
+    name = 'loglevel'
+
+    def convert(self, value, param, ctx):
+        if isinstance(value, int):
+            return value
+        try:
+            return int(value)
+        except ValueError:
+            pass
+        # getLevelName maps registered level names to their value (and returns a string otherwise)
+        level = logging.getLevelName(value.upper())
+        if not isinstance(level, int):
+            self.fail(f'Unknown log level: {value}', param, ctx)
+        return level
 
-print(_driver_classes)
-print(CAMERAS)
 
 @click.group(help='Labcontrol proxy driver management')
 def cli():
     pass
 
 
-@cli.command(help='List proxy drivers that can be spawned on the current host')
-def list():
-    click.echo('Available drivers on this host:\n\n * ' + '\n * '.join(AVAILABLE))
+@cli.command('list', help='List proxy drivers that can be spawned on the current host')
+def list_cmd():
+    click.echo('Available drivers on this host:\n\n * ' + '\n * '.join(sorted(AVAILABLE)))
 
 @cli.command(help='List running proxy drivers')
 def running():
     click.echo('Running drivers:\n\n')
+    names = list(_driver_classes.keys())
+    if not names:
+        return
     with logging_muted():
-        for name in _driver_classes.keys():
-            click.echo(f' * {name+":":<20}', nl=False)
-            d = client_or_None(name, client_name=f'check-{this_host}')
-            if d is not None:
-                click.secho('YES', fg='green')
-            else:
-                click.secho('NO', fg='red')
+        # Probe all drivers at once: the connection attempts are independent
+        with ThreadPoolExecutor(max_workers=len(names)) as executor:
+            clients = executor.map(lambda name: client_or_None(name, client_name=f'check-{this_host}'), names)
+            for name, d in zip(names, clients):
+                click.echo(f' * {name+":":<20}', nl=False)
+                if d is not None:
+                    click.secho('YES', fg='green')
+                else:
+                    click.secho('NO', fg='red')
 
 
 @cli.command(help='Start the server proxy of driver [name]. Does not return.')
 @click.argument('name', nargs=-1)
-@click.option('--log', '-l', 'loglevel', default='INFO', show_default=True, help='Log level.')
-@click.option('--log-global', '-L', 'loglevel_global', default='INFO', show_default=True, help='Log level for all components')
+@click.option('--log', '-l', 'loglevel', default='INFO', show_default=True, type=LogLevel(), help='Log level.')
+@click.option('--log-global', '-L', 'loglevel_global', default='INFO', show_default=True, type=LogLevel(), help='Log level for all components')
 def start(name, loglevel, loglevel_global):
 
-    try:
-        llg = int(loglevel_global)
-    except ValueError:
-        try:
-            llg = logging._nameToLevel[loglevel_global]
-        except KeyError:
-            raise click.BadParameter(f'Unknown log level: {loglevel_global}')
-    rootlogger.setLevel(llg)
+    rootlogger.setLevel(loglevel_global)
 
     # Without driver name: list available drivers on current host
     if not name:
-        list()
+        # Call the function directly rather than through click argument parsing
+        list_cmd.callback()
         return
 
     if len(name) > 1:
@@ -94,14 +105,6 @@ def start(name, loglevel, loglevel_global):
         click.secho('ALREADY RUNNING', fg='yellow')
         return
 
-    try:
-        ll = int(loglevel)
-    except ValueError:
-        try:
-            ll = logging._nameToLevel[loglevel]
-        except KeyError:
-            raise click.BadParameter(f'Unknown log level: {loglevel}')
-
     # Log to file
     log_to_file(os.path.join(LOG_DIR, f'optimato-labcontrol-{name}.log'))
 
@@ -113,7 +116,7 @@ def start(name, loglevel, loglevel_global):
 
     click.secho('RUNNING', fg='green')
 
-    s.instance.set_log_level(ll)
+    s.instance.set_log_level(loglevel)
 
     # Wait for completion, then exit.
     s.wait()
@@ -125,9 +128,8 @@ def start(name, loglevel, loglevel_global):
 def kill(name):
     d = client_or_None(name[0], client_name=f'killer-{this_host}')
     if d:
-        time.sleep(.2)
+        # Client creation and ask_admin are synchronous calls: no need to wait in between
         d.ask_admin(True, True)
-        time.sleep(.2)
         d.kill_server()
 
 
@@ -137,7 +139,6 @@ def killall():
     d = client_or_None('manager', client_name=f'killer-{this_host}')
     if not d:
         click.Abort('Could not connect to manager!')
-    time.sleep(.5)
     try:
         d.ask_admin(True, True)
         d.killall()
@@ -154,12 +155,15 @@ def logall():
 
 @cli.command(help='Start frame viewer')
 @click.argument('name', nargs=1)
-@click.option('--log', '-l', 'loglevel', default='INFO', show_default=True, help='Log level.')
+@click.option('--log', '-l', 'loglevel', default='INFO', show_default=True, type=LogLevel(), help='Log level.')
 @click.option('--type', '-t', 'vtype', default='napari', show_default=True, help='Viewer type: "napari" or "cv".')
 @click.option('--maxfps', '-m', default=10, show_default=True, help='Maximum refresh rate (FPS).')
 def viewer(name, loglevel, vtype, maxfps):
+    # Imported here so that other commands do not load napari and Qt
+    from . import ui
+
     name = name.lower()
-    cam_cls = CAMERAS.get(name, None)
+    cam_cls = _camera_classes.get(name, None)
     addr = cam_cls.DEFAULT_BROADCAST_ADDRESS
     if not addr:
         click.echo(f'Unknown detector: {name}')
@@ -179,16 +183,8 @@ def viewer(name, loglevel, vtype, maxfps):
         click.echo(f'Invalid FPS')
         sys.exit(0)
 
-    try:
-        ll = int(loglevel)
-    except ValueError:
-        try:
-            ll = logging._nameToLevel[loglevel]
-        except KeyError:
-            raise click.BadParameter(f'Unknown log level: {loglevel}')
-
     v = Vclass(address=addr, max_fps=maxfps, camera_name=name)
-    v.logger.setLevel(ll)
+    v.logger.setLevel(loglevel)
     v.start()
     sys.exit(0)
 
@@ -13,7 +13,7 @@ import time
 import atexit
 import socket
 import signal
-from select import select
+import selectors
 
 from . import proxycall, get_config
 from .util import FileDict, Future
@@ -33,18 +33,24 @@ def _recv_all(sock, EOL=b'\n'):
     * all bytes *
     """
     ret = sock.recv(1024)
-    if not ret:
-        # This happens if the connection was closed at the other end
+    if not ret or ret.endswith(EOL):
+        # Empty if the connection was closed at the other end, otherwise the usual single-chunk reply
         return ret
-    while not ret.endswith(EOL):
+    # Accumulate in place rather than creating a new bytes object for each chunk
+    buf = bytearray(ret)
+    while not buf.endswith(EOL):
         try:
-            ret += sock.recv(1024)
+            chunk = sock.recv(1024)
         except TimeoutError:
-            rootlogger.exception(f'EOL not reached after {ret}')
+            rootlogger.exception(f'EOL not reached after {bytes(buf)}')
             raise
         except:
             raise
-    return ret
+        if not chunk:
+            # Connection closed before EOL
+            break
+        buf += chunk
+    return bytes(buf)
 
 
 class emergency_stop:
@@ -227,6 +233,7 @@ class SocketDriverBase(DriverBase):
     logger = None
     REPLY_WAIT_TIME = 0.                # Time before reading reply (needed for asynchronous connections)
     REPLY_TIMEOUT = 60.                  # Maximum time allowed for the reception of a reply
+    RECV_CHUNK_SIZE = 4096              # Size of the reusable chunk into which the socket is read
 
     def __init__(self, device_address):
         """
@@ -250,6 +257,8 @@ class SocketDriverBase(DriverBase):
         self.recv_flag = None
         # Listening/receiving thread
         self.recv_thread = None
+        # Socket pair used to wake up the receiving thread
+        self._recv_wakeup = None
         # Receiver lock
         self.recv_lock = threading.Lock()
 
@@ -269,6 +278,10 @@ class SocketDriverBase(DriverBase):
         # Prepare device socket connection
         self.device_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)  # TCP socket
         self.device_sock.settimeout(self.DEVICE_TIMEOUT)
+        # Commands are short and each waits for a reply: send them immediately (no Nagle delay)
+        self.device_sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        # Let the OS detect a dead connection to an idle device
+        self.device_sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
 
         for retry_count in range(self.NUM_CONNECTION_RETRY):
             conn_errno = self.device_sock.connect_ex(self.device_address)
@@ -283,9 +296,10 @@ class SocketDriverBase(DriverBase):
             raise DeviceException("Can't connect to device")
 
         # Start receiving data
-        self.recv_buffer = b''
+        self.recv_buffer = bytearray()
         self.recv_flag = threading.Event()
         self.recv_flag.clear()
+        self._recv_wakeup = socket.socketpair()
         self.recv_thread = Future(target=self._listen_recv)
 
         self.connected = True
@@ -297,19 +311,48 @@ class SocketDriverBase(DriverBase):
         in a local buffer. For devices that send data only after
         receiving a command, the buffer is read and emptied immediately.
         """
-        while True:
-            rlist, _, elist = select([self.device_sock], [], [self.device_sock], .5)
-            if elist:
-                self.logger.critical('Exceptional event with device socket.')
-                break
-            if rlist:
-                # Incoming data
-                with self.recv_lock:
-                    d = _recv_all(rlist[0], EOL=self.EOL)
-                    self.recv_buffer += d
-                    self.recv_flag.set()
-            if self.shutdown_requested:
-                break
+        chunk = memoryview(bytearray(self.RECV_CHUNK_SIZE))
+        # Data received since the last EOL. It is moved to recv_buffer only once complete.
+        pending = bytearray()
+        wakeup_pair = self._recv_wakeup
+        wakeup = wakeup_pair[1]
+        sel = selectors.DefaultSelector()
+        sel.register(self.device_sock, selectors.EVENT_READ)
+        sel.register(wakeup, selectors.EVENT_READ)
+        try:
+            while not self.shutdown_requested:
+                # The timeout only matters if the socket is closed without waking us up
+                events = sel.select(.5)
+                if self.device_sock.fileno() < 0:
+                    break
+                for key, _ in events:
+                    if key.fileobj is wakeup:
+                        wakeup.recv(64)
+                        continue
+                    # Incoming data, read straight into the reusable chunk
+                    n = self.device_sock.recv_into(chunk)
+                    if n == 0:
+                        self.logger.critical('Device socket closed at the other end.')
+                        return
+                    pending += chunk[:n]
+                    if pending.endswith(self.EOL):
+                        with self.recv_lock:
+                            self.recv_buffer += pending
+                            self.recv_flag.set()
+                        pending.clear()
+        finally:
+            sel.close()
+            for sock in wakeup_pair:
+                sock.close()
+
+    def _wakeup_recv(self):
+        """
+        Interrupt the wait of the receiving thread.
+        """
+        try:
+            self._recv_wakeup[0].send(b'\0')
+        except (OSError, TypeError):
+            pass
 
     def device_cmd(self, cmd: bytes, reply=True) -> bytes:
         """
@@ -358,10 +401,10 @@ class SocketDriverBase(DriverBase):
         with self.recv_lock:
 
             # Reply is in the local buffer
-            data = self.recv_buffer
+            data = bytes(self.recv_buffer)
 
-            # Clear the local buffer
-            self.recv_buffer = b''
+            # Clear the local buffer (in place: the bytearray is reused)
+            self.recv_buffer.clear()
 
             # Clear flag
             self.recv_flag.clear()
@@ -390,6 +433,7 @@ class SocketDriverBase(DriverBase):
         Driver clean up on shutdown.
         """
         self.device_sock.close()
+        self._wakeup_recv()
         self.connected = False
         self.initialized = False
 
@@ -407,6 +451,7 @@ class SocketDriverBase(DriverBase):
             return
         # Tell the polling thread to abort. This will ensure that all the rest is wrapped up
         self.shutdown_requested = True
+        self._wakeup_recv()
         self.logger.info('Shutting down connection to driver.')
 
     def stop(self):
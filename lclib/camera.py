@@ -37,7 +37,10 @@ Detector-specific preparation step before acquisition
 
  * _trigger(self):
 
-The actual frame acquisition step (see existing examples)
+The actual frame acquisition step (see existing examples). Frames can be read
+into buffers obtained with get_free_buffer() to avoid allocating a new array
+for each frame. Cameras that read out multi-frame exposures at once can pass
+the whole stack to enqueue_frame.
 
  * _disarm(self):
 
@@ -67,19 +70,35 @@ This file is part of lab-control-lib
 (c) 2023-2024 Pierre Thibault (pthibault@units.it)
 """
 import os
-import json
 import threading
-from queue import SimpleQueue, Empty
 import time
+from collections import deque
+from enum import IntEnum
+import numpy as np
 
-from . import manager, proxycall
+from . import manager, proxycall, _camera_classes, _register_hooks
 from .base import DriverBase
-from .util import now, Future, frameconsumer
+from .util import now, Future, frameconsumer, json_dumps
 
 DEFAULT_FILE_FORMAT = 'hdf5'
 DEFAULT_BROADCAST_ADDRESS = ('localhost', 5555)
 
 
+class FileFormat(IntEnum):
+    HDF5 = 0
+    TIFF = 1
+
+
+# Accepted file format names, canonical names (as stored in config) and file extensions
+_FILE_FORMATS = {'h5': FileFormat.HDF5,
+                 'hdf': FileFormat.HDF5,
+                 'hdf5': FileFormat.HDF5,
+                 'tif': FileFormat.TIFF,
+                 'tiff': FileFormat.TIFF}
+_FILE_FORMAT_NAMES = ('hdf5', 'tiff')
+_EXT = ('.h5', '.tif')
+
+
 # No @proxydriver because this class is not meant to be instantiated
 class CameraBase(DriverBase):
     """
@@ -93,6 +112,13 @@ class CameraBase(DriverBase):
     DATATYPE = 'uint16'  # Expected datatype
     DEFAULT_FPS = 5.
     MAX_FPS = 5.
+    FRAME_RING_SIZE = 8  # Number of slots in the frame ring buffer
+    WRITE_BATCH = 16  # Maximum number of frames passed at once to the file writer
+    HDF5_CHUNK = None  # HDF5 chunk shape (n_frames, rows, columns) for saved frame stacks (None: from HDF5_CHUNK_BYTES)
+    HDF5_CHUNK_BYTES = 1 << 20  # Target HDF5 chunk size: as many whole frames as fit
+    FRAME_POOL_SIZE = 16  # Maximum number of recycled frame buffers (see get_free_buffer)
+    GETTER_CACHE_TTL = .1  # Seconds during which parameters read from the camera are reused
+    SNAP_KEEPALIVE = 5.  # Seconds an auto-armed camera stays armed after snap (0: disarm immediately)
 
     LOCAL_DEFAULT_CONFIG = {'do_save': True,
                             'file_format': DEFAULT_FILE_FORMAT,
@@ -136,33 +162,75 @@ class CameraBase(DriverBase):
         self.tags = None
         self.end_acquisition = False
         self._scan_path = None
+        self._man = None              # Manager client, resolved at arm() (see _get_manager)
         self.abort_flag = threading.Event()
 
-        self.enqueue_lock = threading.Lock()
+        # Validates the stored file format and caches it as a FileFormat
+        self._file_format_int = None
+        self._ext = None
+        self.file_format = self.config['file_format']
+        self._filename_base = None    # Save directory with trailing separator, set at arm()
 
         self._exposure_time_before_roll = None
         self._exposure_number_before_roll = None
 
+        # Timer that disarms a camera left armed by snap (see SNAP_KEEPALIVE)
+        self._snap_keepalive_lock = threading.RLock()
+        self._snap_keepalive_timer = None
+
         # File writing process
-        self.frame_writer = frameconsumer.FrameWriter()
+        self.frame_writer = frameconsumer.FrameWriter(release=self.release_buffer)
 
         # Prepare metadata collection
+        self._name_lower = self.name.lower()
+        # Pool of cleared dictionaries, recycled once the frame metadata has been consumed
+        self._meta_pool = deque([{} for _ in range(2*self.FRAME_RING_SIZE)], maxlen=2*self.FRAME_RING_SIZE)
         self.metadata = {}
         self.localmeta = {}
+        # Slow-changing camera metadata, built by _build_meta_template and emptied by setters
+        self._meta_template = {}
+        # Values returned by the subclass getters, as (value, time.monotonic()) pairs
+        self._getter_cache = {}
+        # Incremented by _invalidate_cached_values, so that values read before a setter are not stored after it
+        self._cache_generation = 0
         self.grab_metadata = threading.Event()
         self.meta_future = Future(self.metadata_loop)
 
-        self.do_acquire = threading.Event()
+        # Acquisition requests: _acquire_requested is flipped under _acquire_cond,
+        # which is also notified when end_acquisition is set.
+        self._acquire_cond = threading.Condition()
+        self._acquire_requested = False
         self.acquire_done = threading.Event()
         self.frame_queue_empty_flag = threading.Event()
         self.end_of_exposure_flag = threading.Event()
         self.stop_rolling_flag = False
 
-        self.frame_queue = SimpleQueue()
+        # Persistent acquisition thread: arm() sets _loop_requested to run acquisition_loop,
+        # _loop_idle is set whenever acquisition_loop is not running.
+        self._loop_requested = False
+        self._loop_idle = threading.Event()
+        self._loop_idle.set()
+        self._loop_thread = None
+        self.loop_future = Future(self._acquisition_thread)
+
+        # Frame ring buffer: a fixed number of reusable [frame, meta, rolling] slots.
+        # enqueue_frame writes at the tail, frame_management_loop reads at the head.
+        # Both counters only increase, the slot index is the counter modulo FRAME_RING_SIZE.
+        self._ring = [[None, None, False] for _ in range(self.FRAME_RING_SIZE)]
+        self._ring_head = 0
+        self._ring_tail = 0
+        self._ring_cond = threading.Condition()
         self.frame_future = Future(self.frame_management_loop)
 
+        # Reusable frame buffers handed out by get_free_buffer, shape fixed at arm()
+        # _frame_pool maps id(buffer) -> [buffer, number of consumers still using it]
+        self._frame_pool_lock = threading.Lock()
+        self._frame_pool = {}
+        self._free_buffers = []
+        self._frame_pool_shape = None
+
         # Broadcasting process
-        self.frame_streamer = frameconsumer.FrameStreamer(self.broadcast_address[1])
+        self.frame_streamer = frameconsumer.FrameStreamer(self.broadcast_address[1], release=self.release_buffer)
         if self.config['do_broadcast']:
             self.frame_streamer.on()
 
@@ -212,23 +280,45 @@ class CameraBase(DriverBase):
         self.exposure_number before proceeding with the acquisition.
         NOTE: These parameters are ignored if the camera is already armed.
         Otherwise, the new parameters persist as the end of the acquisition.
+
+        A camera armed automatically by snap stays armed for SNAP_KEEPALIVE seconds
+        so that subsequent calls with the same parameters skip arm() and disarm().
         """
         if self.rolling:
             self.logger.warning("Cannot snap while in rolling mode.")
             return
 
         # If the manager crashes, getManager() will return None and we can't continue
-        man = manager.getManager()
+        man = self._get_manager()
         if man is None:
             self.logger.error("Not connected to manager! Can't start acquisition!")
             return
 
+        # Reuse the acquisition loop if the camera was left armed by the previous snap
+        with self._snap_keepalive_lock:
+            kept_alive = self._snap_keepalive_timer is not None
+            if kept_alive:
+                if man.scan_path != self._scan_path:
+                    # A scan started or ended since the camera was armed
+                    self.logger.debug('Scan path changed. Disarming first.')
+                    self.disarm()
+                    kept_alive = False
+                elif (exp_time is None or exp_time == self.exposure_time) and \
+                   (exp_num is None or exp_num == self.exposure_number):
+                    self._snap_keepalive_timer.cancel()
+                    self._snap_keepalive_timer = None
+                else:
+                    self.logger.debug('New exposure parameters. Disarming first.')
+                    self.disarm()
+                    kept_alive = False
+
         # If the camera is not armed, we arm it and remember that it was done automatically in snap
-        self.auto_armed = False
-        if not self.armed:
-            self.logger.debug('Camera was not armed when calling snap. Arming first.')
-            self.auto_armed = True
-            self.arm(exp_time=exp_time, exp_num=exp_num)
+        if not kept_alive:
+            self.auto_armed = False
+            if not self.armed:
+                self.logger.debug('Camera was not armed when calling snap. Arming first.')
+                self.auto_armed = True
+                self.arm(exp_time=exp_time, exp_num=exp_num)
 
         # Set new tags
         self.tags = tags
@@ -238,15 +328,15 @@ class CameraBase(DriverBase):
         # Build filename
         if self.in_scan:
             prefix = man.next_prefix()
-            self.filename = self._build_filename(prefix=prefix, path=self._scan_path)
+            self.filename = self._build_filename(prefix=prefix)
         else:
             self.counter += 1
-            self.filename = self._build_filename(prefix=self.file_prefix, path=self.save_path)
+            self.filename = self._build_filename(prefix=self.file_prefix)
 
         self.logger.info(f'Save path: {self.filename}')
 
         # Trigger next acquisition now
-        self.do_acquire.set()
+        self._request_acquisition()
 
         # Wait for the end of the acquisition
         self.acquire_done.wait()
@@ -254,8 +344,15 @@ class CameraBase(DriverBase):
         self.acquire_done.clear()
 
         if self.auto_armed:
-            self.logger.debug('Camera was auto-armed. Disarming')
-            self.disarm()
+            if self.SNAP_KEEPALIVE and not self.end_acquisition:
+                self.logger.debug(f'Camera was auto-armed. Keeping armed for {self.SNAP_KEEPALIVE} s')
+                with self._snap_keepalive_lock:
+                    self._snap_keepalive_timer = threading.Timer(self.SNAP_KEEPALIVE, self._snap_keepalive_timeout)
+                    self._snap_keepalive_timer.daemon = True
+                    self._snap_keepalive_timer.start()
+            else:
+                self.logger.debug('Camera was auto-armed. Disarming')
+                self.disarm()
 
         # Forget tags
         self.tags = None
@@ -282,26 +379,70 @@ class CameraBase(DriverBase):
         """
         Main acquisition loop.
 
-        NOTE: This it started on a thread every time the camera is armed.
+        NOTE: This is run by _acquisition_thread every time the camera is armed.
+        Once the first acquisition is requested, the loop specialized for the
+        current mode (_acquisition_loop_snap or _acquisition_loop_roll) takes over.
         """
         self.logger.debug('Acquisition loop started')
         self.abort_flag.clear()
-        while True:
+        if self._wait_acquisition_request():
+            if self.rolling:
+                self._acquisition_loop_roll()
+            else:
+                self._acquisition_loop_snap()
 
-            # Wait for the next trigger
-            if not self.do_acquire.wait(.2):
-                if self.end_acquisition:
-                    self.logger.debug('end_acquisition is True. Breaking out.')
+        # The loop is closed, we are done
+        self.logger.debug('Acquisition loop completed')
+
+    def _acquisition_thread(self):
+        """
+        Running on a thread for the lifetime of the camera. Runs acquisition_loop
+        each time the camera is armed.
+        """
+        self._loop_thread = threading.current_thread()
+        while True:
+            with self._acquire_cond:
+                while not (self._loop_requested or self.closing):
+                    self._acquire_cond.wait()
+                if not self._loop_requested:
                     break
-                continue
+                self._loop_requested = False
+            try:
+                self.acquisition_loop()
+            except:
+                self.logger.exception('Error in acquisition loop')
+            finally:
+                self._loop_idle.set()
+
+    def _wait_acquisition_request(self) -> bool:
+        """
+        Wait for the next trigger. Return False if end_acquisition was set instead.
+        """
+        with self._acquire_cond:
+            while not (self._acquire_requested or self.end_acquisition):
+                self._acquire_cond.wait()
+            if not self._acquire_requested:
+                self.logger.debug('end_acquisition is True. Breaking out.')
+                return False
+            self._acquire_requested = False
+        self.logger.debug('Received acquisition request.')
+        return True
+
+    def _acquisition_loop_snap(self):
+        """
+        Acquisition loop for saved exposures (snap). Returns when the camera is
+        disarmed, or hands over to _acquisition_loop_roll if rolling starts.
+        """
+        while True:
             filename = self.filename
-            self.do_acquire.clear()
-            self.logger.debug('Received acquisition request (do_acquire flag).')
 
             # Prepare next acquisition on the file writing process
-            if not self.rolling:
-                self.logger.debug('Requesting opening to file writer.')
-                self.frame_writer.open(filename=filename)
+            self.logger.debug('Requesting opening to file writer.')
+            self.frame_writer.open(filename=filename,
+                                   chunks=self.HDF5_CHUNK,
+                                   shape=tuple(self.shape),
+                                   dtype=self.DATATYPE,
+                                   chunk_bytes=self.HDF5_CHUNK_BYTES)
 
             # trigger acquisition with subclassed method and wait until it is done
             self.logger.debug('Calling the subclass trigger.')
@@ -313,18 +454,12 @@ class CameraBase(DriverBase):
                 self.enqueue_frame(None, None)
             except:
                 self.logger.exception('Error in _trigger')
+                # The loop terminates: snap should not keep the camera armed
+                self.end_acquisition = True
                 self.acquire_done.set()
-                if not self.rolling:
-                    self.logger.warning(f'File {filename} likely incomplete or corrupt because of an error in _trigger.')
-                    self.frame_writer.close()
-                else:
-                    self.roll_off()
-                break
-
-            #if self.abort_flag.is_set():
-            #    self.logger.info('Acquisition aborted.')
-            #    self.acquire_done.set()
-            #    break
+                self.logger.warning(f'File {filename} likely incomplete or corrupt because of an error in _trigger.')
+                self.frame_writer.close()
+                return
 
             self.logger.debug('Done calling the subclass trigger.')
 
@@ -332,28 +467,56 @@ class CameraBase(DriverBase):
             self.logger.debug('Setting acquire_done flag.')
             self.acquire_done.set()
 
-            if self.rolling:
-                if self.stop_rolling_flag:
-                    # We are done rolling
-                    break
-                # We are not done rolling - ask immediately for another frame
-                self.do_acquire.set()
-                continue
-            else:
-                # Finalize saving
-                self.end_of_exposure_flag.wait()
-                self.logger.debug('Calling file_writer.close()')
-                self.frame_writer.close()
+            # Finalize saving
+            self.end_of_exposure_flag.wait()
+            self.logger.debug('Calling file_writer.close()')
+            self.frame_writer.close()
 
-            # Automatically armed - this is a single shot
-            if self.auto_armed:
-                break
+            # Automatically armed - this is a single shot unless kept alive by snap
+            if self.auto_armed and not self.SNAP_KEEPALIVE:
+                return
 
             # Get ready for next acquisition
             self._rearm()
 
-        # The loop is closed, we are done
-        self.logger.debug('Acquisition loop completed')
+            if not self._wait_acquisition_request():
+                return
+            if self.rolling:
+                return self._acquisition_loop_roll()
+
+    def _acquisition_loop_roll(self):
+        """
+        Acquisition loop for rolling mode: frames are not saved and exposures are
+        retriggered immediately until roll_off sets stop_rolling_flag.
+        """
+        while True:
+            self.logger.debug('Calling the subclass trigger.')
+            try:
+                # Execute actual exposures
+                self._trigger()
+
+                # Enqueue None to signal end-of-exposure
+                self.enqueue_frame(None, None)
+            except:
+                self.logger.exception('Error in _trigger')
+                self.acquire_done.set()
+                self.roll_off()
+                return
+
+            self.logger.debug('Done calling the subclass trigger.')
+            self.acquire_done.set()
+
+            # We are done rolling
+            if self.stop_rolling_flag or self.end_acquisition:
+                return
+
+    def _request_acquisition(self):
+        """
+        Wake up the acquisition loop for a new acquisition.
+        """
+        with self._acquire_cond:
+            self._acquire_requested = True
+            self._acquire_cond.notify_all()
 
     def metadata_loop(self):
         """
@@ -363,15 +526,15 @@ class CameraBase(DriverBase):
         time.sleep(.5)
         self.logger.debug('Metadata loop started')
         while True:
-            if not self.grab_metadata.wait(1):
-                if self.closing:
-                    return
-                continue
+            # shutdown() also sets the flag to wake up this loop
+            self.grab_metadata.wait()
+            if self.closing:
+                break
             self.grab_metadata.clear()
             self.logger.debug('Metadata collection requested (grab_metadata flag)')
 
             # Request global metadata (exclude self, we do that locally instead)
-            man = manager.getManager()
+            man = self._get_manager()
             if man is None:
                 self.logger.error("Not connected to manager! Cannot request metadata!")
             else:
@@ -384,53 +547,102 @@ class CameraBase(DriverBase):
 
     def frame_management_loop(self):
         """
-        Running on a thread. Watches self.frame_queue and deals with the data as
+        Running on a thread. Watches the frame ring buffer and deals with the data as
         it comes.
         """
         time.sleep(.5)
+        # Frames waiting to be sent to the file writer
+        batch_datas = []
+        batch_metas = []
         while True:
-            try:
-                item = self.frame_queue.get(timeout=1.)
-            except Empty:
-                self.frame_queue_empty_flag.set()
-                if self.closing:
-                    break
-                else:
-                    continue
-
-            self.logger.debug(f'New frame arrived in queue (remaining: {self.frame_queue.qsize()})')
+            with self._ring_cond:
+                # All frames dealt with. The flag is set and cleared under _ring_cond only
+                if self._ring_head == self._ring_tail and not self.frame_queue_empty_flag.is_set():
+                    self.logger.debug('Setting frame queue empty flag.')
+                    self.frame_queue_empty_flag.set()
+                while self._ring_head == self._ring_tail:
+                    if self.closing:
+                        return
+                    self._ring_cond.wait()
+
+                # Take the frame out of the slot and release it for the producer
+                slot = self._ring[self._ring_head % self.FRAME_RING_SIZE]
+                data, meta, rolling = slot
+                slot[0] = None
+                slot[1] = None
+                self._ring_head += 1
+                remaining = self._ring_tail - self._ring_head
+                self._ring_cond.notify_all()
+
+            self.logger.debug(f'New frame arrived in queue (remaining: {remaining})')
+
+            # A stack of frames comes with a list of metadata
+            is_stack = type(meta) is list
+
+            # Read once: live_on/live_off may change it while this frame is dealt with
+            broadcast = self.config['do_broadcast']
+
+            # Consumers release the frame buffers they received (see release_buffer)
+            if data is not None:
+                frames = list(data) if is_stack else [data]
+                for i, frame in enumerate(frames):
+                    self._claim_buffer(frame, (not rolling) + (broadcast and i == len(frames) - 1))
 
             # Deal with frame
-            data, meta = item
+            if data is not None and not rolling:
+                if is_stack:
+                    batch_datas.extend(data)
+                    batch_metas.extend(meta)
+                else:
+                    batch_datas.append(data)
+                    batch_metas.append(meta)
+
+            # Send the batch when full, at the end of exposure, or if no frame is waiting
+            if batch_datas and (data is None or remaining == 0 or len(batch_datas) >= self.WRITE_BATCH):
+                self.logger.debug(f'Calling file_writer.store_batch() with {len(batch_datas)} frames')
+                try:
+                    self.frame_writer.store_batch(datas=batch_datas, metas=batch_metas)
+                except RuntimeError:
+                    self.logger.exception("Problem sending data to the file_writer process")
+                    for d in batch_datas:
+                        self.release_buffer(d)
+                self.logger.debug('file_writer.store_batch() returned')
+                # The current frame may be part of this batch and still has to be
+                # broadcast: recycle the metadata only once this iteration is done.
+                done_metas = batch_metas
+                batch_datas = []
+                batch_metas = []
+            else:
+                done_metas = []
 
             if data is None:
                 self.logger.debug('Setting end-of-exposure flag')
                 self.end_of_exposure_flag.set()
+                for m in done_metas:
+                    self._recycle_meta(m)
                 continue
 
-            if not self.rolling:
-                self.logger.debug('Calling file_writer.store() with frame')
-                try:
-                    self.frame_writer.store(meta=meta, data=data)
-                except RuntimeError:
-                    self.logger.exception("Problem sending data to the file_writer process")
-                self.logger.debug('file_writer.store() returned')
-
-            if self.config['do_broadcast']:
+            if broadcast:
                 self.logger.debug('Calling file_streamer.store() with frame')
-                self.frame_streamer.store(meta=meta, data=data)
+                if is_stack:
+                    # Only the last frame of a stack is worth publishing
+                    self.frame_streamer.store(meta=meta[-1], data=data[-1])
+                else:
+                    self.frame_streamer.store(meta=meta, data=data)
                 self.logger.debug('file_streamer.store() returned')
 
-            if self.frame_queue.qsize() == 0:
-                self.logger.debug('Setting frame queue empty flag.')
-                self.frame_queue_empty_flag.set()
+            # Writer and streamer have copied what they need: metadata can be recycled now
+            if rolling:
+                done_metas.extend(meta if is_stack else [meta])
+            for m in done_metas:
+                self._recycle_meta(m)
 
     @proxycall()
     def get_meta(self, metakeys=None):
         """
         Return camera-specific metadata
         """
-        man = manager.getManager()
+        man = self._get_manager()
 
         if man is None:
             self.logger.error("Could not connect to manager! metadata will be incomplete.")
@@ -441,69 +653,197 @@ class CameraBase(DriverBase):
             scan_path = man.scan_path
             scan_counter = man.get_counter() if scan_path else None
 
-        meta = {'detector': self.name,
-                'scan_name': scan_name,
-                'psize': self.psize,
-                'epsize': self.epsize,
-                'exposure_time': self.exposure_time,
-                'exposure_number': self.exposure_number,
-                'operation_mode': self.operation_mode,
-                'filename': self.filename,
-                'snap_counter': self.counter,
-                'scan_counter': scan_counter,
-                'tags': self.tags}
+        template = self._meta_template
+        if not template:
+            template = self._build_meta_template()
+
+        meta = template.copy()
+        meta['scan_name'] = scan_name
+        meta['filename'] = self.filename
+        meta['snap_counter'] = self.counter
+        meta['scan_counter'] = scan_counter
+        meta['tags'] = self.tags
         return meta
 
+    def _build_meta_template(self):
+        """
+        Query the camera parameters that do not change between frames and store them
+        for get_meta. The template is emptied by the corresponding property setters.
+        """
+        generation = self._cache_generation
+        template = {'detector': self.name,
+                    'scan_name': None,
+                    'psize': self.psize,
+                    'epsize': self.epsize,
+                    'exposure_time': self.exposure_time,
+                    'exposure_number': self.exposure_number,
+                    'operation_mode': self.operation_mode,
+                    'filename': None,
+                    'snap_counter': None,
+                    'scan_counter': None,
+                    'tags': None}
+        # Keep it only if no setter was called in the meantime
+        if generation == self._cache_generation:
+            self._meta_template = template
+        return template
+
     def enqueue_frame(self, frame, meta):
         """
-        Add frame and meta to the queue. This is meant to be called
+        Add frame and meta to the ring buffer. This is meant to be called
         within _trigger at least once.
-        """
-        with self.enqueue_lock:
-            # Manage end-of-exposure differently
-            if frame is None:
-                self.end_of_exposure_flag.clear()
-                self.frame_queue.put((frame, meta))
-                return
 
+        Blocks while the ring buffer is full, until frame_management_loop frees a slot.
+
+        frame can also be a stack of frames (one more dimension than self.shape) read
+        out at once. It then takes a single slot, and meta is either a dictionary that
+        applies to all frames or a list with one dictionary per frame.
+
+        The dictionaries self.metadata and self.localmeta are handed over with the frame:
+        they are cleared and reused once the frame has been consumed.
+        """
+        # Manage end-of-exposure differently
+        if frame is None:
+            self.end_of_exposure_flag.clear()
+            metadata = None
+        else:
             self.logger.debug('Frame arrived in enqueue_frame')
-            self.frame_queue_empty_flag.clear()
 
             metadata = self.metadata
             localmeta = self.localmeta
 
-            self.metadata = {}
-            self.localmeta = {}
+            self.metadata = self._new_meta()
+            self.localmeta = self._new_meta()
+
+            # Compare with the frame shape fixed at arm(), not to query the camera for each frame
+            if frame.ndim > len(self._frame_pool_shape):
+                # Stack: one metadata dictionary per frame
+                metas = meta if isinstance(meta, (list, tuple)) else [meta] * len(frame)
+                stack_metadata = []
+                for m in metas:
+                    md = metadata.copy()
+                    md[self._name_lower] = localmeta.copy()
+                    md[self._name_lower].update(m)
+                    stack_metadata.append(md)
+                # Both dictionaries have been copied: return them to the pool
+                metadata[self._name_lower] = localmeta
+                self._recycle_meta(metadata)
+                metadata = stack_metadata
+            else:
+                # Update frame metadata
+                localmeta.update(meta)
+                metadata[self._name_lower] = localmeta
+
+        # Write in the slot at the tail of the ring buffer
+        with self._ring_cond:
+            while self._ring_tail - self._ring_head >= self.FRAME_RING_SIZE:
+                self._ring_cond.wait()
+            if frame is not None and self.frame_queue_empty_flag.is_set():
+                self.frame_queue_empty_flag.clear()
+            slot = self._ring[self._ring_tail % self.FRAME_RING_SIZE]
+            slot[0] = frame
+            slot[1] = metadata
+            slot[2] = self.rolling
+            self._ring_tail += 1
+            self._ring_cond.notify_all()
+
+        if frame is not None:
+            self.logger.debug('Frame added to queue.')
 
-            # Update frame metadata and add to queue
-            localmeta.update(meta)
-            metadata[self.name.lower()] = localmeta
+    def get_free_buffer(self):
+        """
+        Return an empty array of shape self.shape and type DATATYPE for _trigger to
+        fill in place (e.g. with np.copyto or readinto) before calling enqueue_frame.
 
-            self.frame_queue.put((frame, metadata))
-            self.logger.debug('Frame added to queue.')
+        A buffer is handed out again only once the file writer and the streamer
+        have released it (see release_buffer), so frames they still hold are never
+        overwritten. A buffer obtained here must be passed to enqueue_frame.
+        """
+        if self._frame_pool_shape is None:
+            self._reset_frame_pool()
+        with self._frame_pool_lock:
+            if self._free_buffers:
+                return self._free_buffers.pop()
+            buf = np.empty(self._frame_pool_shape, dtype=self.DATATYPE)
+            if len(self._frame_pool) < self.FRAME_POOL_SIZE:
+                self._frame_pool[id(buf)] = [buf, 0]
+        return buf
 
-    def _build_filename(self, prefix, path) -> str:
+    def _claim_buffer(self, buf, users):
         """
-        Build the full file name to save to.
+        Record the number of consumers a pooled buffer is handed to.
+        The buffer goes back to the pool immediately if there are none.
+        """
+        with self._frame_pool_lock:
+            entry = self._frame_pool.get(id(buf))
+            if entry is None or entry[0] is not buf:
+                return
+            entry[1] = users
+            if not users:
+                self._free_buffers.append(buf)
+
+    def release_buffer(self, buf):
+        """
+        Called by consumers when they are done with a frame. Buffers that do not
+        come from get_free_buffer are ignored.
+        """
+        with self._frame_pool_lock:
+            entry = self._frame_pool.get(id(buf))
+            if entry is None or entry[0] is not buf or not entry[1]:
+                return
+            entry[1] -= 1
+            if not entry[1]:
+                self._free_buffers.append(buf)
+
+    def _reset_frame_pool(self):
+        """
+        Drop pooled buffers if the frame shape has changed.
+        """
+        shape = tuple(self.shape)
+        with self._frame_pool_lock:
+            if shape != self._frame_pool_shape:
+                self._frame_pool = {}
+                self._free_buffers = []
+                self._frame_pool_shape = shape
+
+    def _new_meta(self):
+        """
+        Return an empty dictionary from the metadata pool.
+        """
+        try:
+            return self._meta_pool.popleft()
+        except IndexError:
+            return {}
+
+    def _recycle_meta(self, metadata):
+        """
+        Clear the frame metadata dictionaries built by enqueue_frame and return them to the pool.
+        """
+        localmeta = metadata.get(self._name_lower)
+        metadata.clear()
+        self._meta_pool.append(metadata)
+        if type(localmeta) is dict:
+            localmeta.clear()
+            self._meta_pool.append(localmeta)
+
+    def _build_filename(self, prefix) -> str:
+        """
+        Build the full file name to save to, in the directory set by _update_filename_base.
         """
 
         # Try to replace counter of prefix is a format string.
         try:
             prefix = prefix.format(self.counter)
-        except NameError:
+        except (IndexError, KeyError, ValueError):
             pass
 
-        full_file_prefix = os.path.join(self.BASE_PATH, path, prefix)
-
-        # Add extension based on file format
-        if self.file_format == 'hdf5':
-            filename = full_file_prefix + '.h5'
-        elif self.file_format == 'tiff':
-            filename = full_file_prefix + '.tif'
-        else:
-            raise RuntimeError(f'Unknown file format: {self.file_format}.')
-        return filename
+        return f'{self._filename_base}{prefix}{self._ext}'
 
+    def _update_filename_base(self):
+        """
+        Compute the save directory: the scan path if in a scan, otherwise save_path.
+        """
+        path = self._scan_path if self._scan_path is not None else self.save_path
+        self._filename_base = os.path.join(self.BASE_PATH, path, '')
 
     @proxycall(admin=True)
     def arm(self, exp_time=None, exp_num=None):
@@ -513,6 +853,9 @@ class CameraBase(DriverBase):
         if self.rolling:
             raise RuntimeError('Camera is rolling. Call roll_off first.')
 
+        # An explicit arm() takes over from a camera left armed by snap
+        self._end_snap_keepalive()
+
         if self.armed:
             self.logger.warning('arm() called but camera already armed.')
             return
@@ -531,21 +874,32 @@ class CameraBase(DriverBase):
         # Reset stopping flag
         self.end_acquisition = False
         self.acquire_done.clear()
-        self.do_acquire.clear()
+        self._acquire_requested = False
 
         # Check if this is part of a scan
-        man = manager.getManager()
+        self._man = man = manager.getManager()
         if man is None:
             self.logger.error("Not connected to manager! Can't check scan path!")
             self._scan_path = None
         else:
             self._scan_path = man.scan_path
+        self._update_filename_base()
 
         # Finish arming with subclassed method
         self._arm()
+        self._invalidate_cached_values()
+
+        # Frame buffers with the shape of this acquisition
+        self._reset_frame_pool()
+
+        # Parameters are now fixed for the duration of the acquisition
+        self._build_meta_template()
 
         # Start the main acquisition loop
-        self.loop_future = Future(self.acquisition_loop)
+        with self._acquire_cond:
+            self._loop_idle.clear()
+            self._loop_requested = True
+            self._acquire_cond.notify_all()
 
         self.armed = True
 
@@ -553,13 +907,33 @@ class CameraBase(DriverBase):
     def in_scan(self):
         """
         True if within a scan context.
+
+        While armed, this reflects the scan path obtained at arm().
         """
-        man = manager.getManager()
+        if self.armed:
+            return self._scan_path is not None
+        man = self._get_manager()
         if man is None:
             self.logger.error("Could not connect to manager!")
             return False
         return man.scan_path is not None
 
+    def _get_manager(self):
+        """
+        Return the manager client cached at arm() time, resolving it if needed.
+        """
+        if self._man is None:
+            self._man = manager.getManager()
+        return self._man
+
+    @proxycall(admin=True)
+    def refresh_manager(self):
+        """
+        Drop the cached manager client and reconnect. Returns True if connected.
+        """
+        self._man = manager.getManager(refresh=True)
+        return self._man is not None
+
     @proxycall(admin=True)
     def disarm(self):
         """
@@ -573,13 +947,19 @@ class CameraBase(DriverBase):
 
         self.logger.debug('Disarm called')
 
+        with self._snap_keepalive_lock:
+            if self._snap_keepalive_timer is not None:
+                self._snap_keepalive_timer.cancel()
+                self._snap_keepalive_timer = None
+
         # Terminate acquisition loop and wait for it to complete
-        self.end_acquisition = True
+        with self._acquire_cond:
+            self.end_acquisition = True
+            self._acquire_cond.notify_all()
 
-        try:
-            self.loop_future.join()
-        except AttributeError:
-            pass
+        # Not possible if called from the loop itself (e.g. roll_off after an error in _trigger)
+        if threading.current_thread() is not self._loop_thread:
+            self._loop_idle.wait()
 
         # Disarm with subclassed method
         self._disarm()
@@ -587,6 +967,26 @@ class CameraBase(DriverBase):
         # Reset flags
         self.armed = False
 
+    def _end_snap_keepalive(self):
+        """
+        Disarm now if the camera was left armed by snap.
+        """
+        with self._snap_keepalive_lock:
+            if self._snap_keepalive_timer is not None:
+                self.logger.debug('Ending snap keep-alive.')
+                self.disarm()
+
+    def _snap_keepalive_timeout(self):
+        """
+        Called on the keep-alive timer thread when no snap came within SNAP_KEEPALIVE seconds.
+        """
+        with self._snap_keepalive_lock:
+            # Cancelled or replaced while waiting for the lock
+            if self._snap_keepalive_timer is not threading.current_thread():
+                return
+            self.logger.debug('Snap keep-alive expired. Disarming.')
+            self.disarm()
+
     @proxycall(admin=True)
     def roll_on(self, fps=None):
         """
@@ -634,7 +1034,7 @@ class CameraBase(DriverBase):
         self.rolling = True
 
         # Trigger the first acquisition
-        self.do_acquire.set()
+        self._request_acquisition()
 
 
     @proxycall(admin=True)
@@ -682,7 +1082,7 @@ class CameraBase(DriverBase):
                     'file_prefix': self.file_prefix,
                     'save_path': self.save_path,
                     'magnification': self.magnification}
-        return json.dumps(settings)
+        return json_dumps(settings).decode()
 
     @proxycall()
     def set_log_level(self, level):
@@ -696,12 +1096,19 @@ class CameraBase(DriverBase):
     def shutdown(self):
         # Stop rolling
         self.roll_off()
+        # Disarm if left armed by snap
+        self._end_snap_keepalive()
         # Stop file_writer process
         self.frame_writer.stop()
         # Stop file_streamer process
         self.frame_streamer.stop()
-        # Stop metadata loop
+        # Stop metadata, acquisition and frame management loops
         self.closing = True
+        self.grab_metadata.set()
+        with self._acquire_cond:
+            self._acquire_cond.notify_all()
+        with self._ring_cond:
+            self._ring_cond.notify_all()
 
     #
     # GETTERS / SETTERS TO IMPLEMENT IN SUBCLASSES
@@ -777,6 +1184,29 @@ class CameraBase(DriverBase):
         """
         raise NotImplementedError
 
+    def _cached_get(self, key, getter, ttl):
+        """
+        Return getter(), reusing the value obtained less than ttl seconds ago.
+        """
+        t = time.monotonic()
+        cached = self._getter_cache.get(key)
+        if cached is not None and t - cached[1] < ttl:
+            return cached[0]
+        generation = self._cache_generation
+        value = getter()
+        if generation == self._cache_generation:
+            self._getter_cache[key] = (value, t)
+        return value
+
+    def _invalidate_cached_values(self):
+        """
+        Forget parameters read from the camera. Called by the property setters
+        (after writing to the camera) and arm().
+        """
+        self._cache_generation += 1
+        self._getter_cache.clear()
+        self._meta_template = {}
+
     #
     # PROPERTIES
     #
@@ -791,12 +1221,13 @@ class CameraBase(DriverBase):
 
     @file_format.setter
     def file_format(self, value):
-        if value.lower() in ['h5', 'hdf', 'hdf5']:
-            self.config['file_format'] = 'hdf5'
-        elif value.lower() in ['tif', 'tiff']:
-            self.config['file_format'] = 'tiff'
-        else:
+        try:
+            file_format = _FILE_FORMATS[value.lower()]
+        except KeyError:
             raise RuntimeError(f'Unknown file format: {value}')
+        self._file_format_int = file_format
+        self._ext = _EXT[file_format]
+        self.config['file_format'] = _FILE_FORMAT_NAMES[file_format]
 
     @proxycall(admin=True)
     @property
@@ -824,18 +1255,21 @@ class CameraBase(DriverBase):
         Set save path
         """
         self.config['save_path'] = value
+        self._update_filename_base()
 
-    @proxycall(admin=True)
+    @proxycall(admin=True, cache_ttl=.5)
     @property
     def exposure_time(self):
         """
         Exposure time in seconds.
         """
-        return self._get_exposure_time()
+        return self._cached_get('exposure_time', self._get_exposure_time, self.GETTER_CACHE_TTL)
 
     @exposure_time.setter
     def exposure_time(self, value):
+        self._end_snap_keepalive()
         self._set_exposure_time(value)
+        self._invalidate_cached_values()
 
     @proxycall(admin=True)
     @property
@@ -843,11 +1277,13 @@ class CameraBase(DriverBase):
         """
         Set exposure mode.
         """
-        return self._get_operation_mode()
+        return self._cached_get('operation_mode', self._get_operation_mode, self.GETTER_CACHE_TTL)
 
     @operation_mode.setter
     def operation_mode(self, value):
+        self._end_snap_keepalive()
         self._set_operation_mode(value)
+        self._invalidate_cached_values()
 
     @proxycall(admin=True)
     @property
@@ -855,11 +1291,13 @@ class CameraBase(DriverBase):
         """
         Number of exposures.
         """
-        return self._get_exposure_number()
+        return self._cached_get('exposure_number', self._get_exposure_number, self.GETTER_CACHE_TTL)
 
     @exposure_number.setter
     def exposure_number(self, value):
+        self._end_snap_keepalive()
         self._set_exposure_number(value)
+        self._invalidate_cached_values()
 
     @proxycall(admin=True)
     @property
@@ -867,27 +1305,29 @@ class CameraBase(DriverBase):
         """
         Binning type.
         """
-        return self._get_binning()
+        return self._cached_get('binning', self._get_binning, self.GETTER_CACHE_TTL)
 
     @binning.setter
     def binning(self, value):
+        self._end_snap_keepalive()
         self._set_binning(value)
+        self._invalidate_cached_values()
 
-    @proxycall()
+    @proxycall(cache_ttl=.5)
     @property
     def psize(self):
         """
         Pixel size in um (taking into account binning)
         """
-        return self._get_psize()
+        return self._cached_get('psize', self._get_psize, self.GETTER_CACHE_TTL)
 
-    @proxycall()
+    @proxycall(cache_ttl=.5)
     @property
     def shape(self):
         """
         Array shape (taking into account binning)
         """
-        return self._get_shape()
+        return self._cached_get('shape', self._get_shape, self.GETTER_CACHE_TTL)
 
     @proxycall(admin=True)
     @property
@@ -900,8 +1340,9 @@ class CameraBase(DriverBase):
     @magnification.setter
     def magnification(self, value):
         self.config['magnification'] = float(value)
+        self._invalidate_cached_values()
 
-    @proxycall(admin=True)
+    @proxycall(admin=True, cache_ttl=.5)
     @property
     def epsize(self):
         """
@@ -962,7 +1403,7 @@ class CameraBase(DriverBase):
         self.frame_streamer.off()
         self.config['do_broadcast'] = False
 
-    @proxycall()
+    @proxycall(cache_ttl=.5)
     @property
     def is_live(self):
         """
@@ -970,7 +1411,7 @@ class CameraBase(DriverBase):
         """
         return self.config['do_broadcast']
 
-    @proxycall(admin=True)
+    @proxycall(admin=True, cache_ttl=.5)
     @property
     def save(self):
         """
@@ -992,3 +1433,14 @@ class CameraBase(DriverBase):
     @counter.setter
     def counter(self, value: int):
         self.config['counter'] = value
+
+
+def _register_camera(driver_name, cls):
+    """
+    Called by register_driver: keep track of camera drivers separately.
+    """
+    if issubclass(cls, CameraBase):
+        _camera_classes[driver_name] = cls
+
+
+_register_hooks.append(_register_camera)
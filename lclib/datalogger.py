@@ -5,23 +5,28 @@ This file is part of lab-control-lib
 (c) 2023-2024 Pierre Thibault (pthibault@units.it)
 """
 from . import manager
+from . import get_config
 from .util import DataLogger
-from . import config
+from .logs import logger as rootlogger
 
 __all__ = ['datalogger']
 
+logger = rootlogger.getChild('LCDataLogger')
 
-class LCDataLogger(DataLogger):
 
-    DEFAULT_ADDRESS = NETWORK_CONF['datalogger']['control']
+class LCDataLogger(DataLogger):
 
     def __init__(self, address=None):
         """
         Initilization
         """
+        config = get_config()
         influxdb_token = config.get('influxdb_token')
         if influxdb_token is None:
-            dl.logger.error('Influxdb token not found.')
+            logger.error('Influxdb token not found.')
+        if address is None:
+            # Looked up here rather than at import time
+            address = NETWORK_CONF['datalogger']['control']
         super().__init__(address=address, token=influxdb_token)
 
     def get_tags(self):
@@ -29,6 +34,7 @@ class LCDataLogger(DataLogger):
         Add tags related to current scan
         """
         man = manager.getManager()
+        config = get_config()
 
         if man is None:
             tags = {'host': config['this_host']}
@@ -40,4 +46,17 @@ class LCDataLogger(DataLogger):
         return tags
 
 
-datalogger = LCDataLogger()
+_datalogger = None
+
+
+def __getattr__(name):
+    """
+    Create the module-level `datalogger` on first access, so that importing this module
+    does not require init() to have been called or a database connection.
+    """
+    global _datalogger
+    if name == 'datalogger':
+        if _datalogger is None:
+            _datalogger = LCDataLogger()
+        return _datalogger
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
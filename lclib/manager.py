@@ -10,6 +10,7 @@ This file is part of lab-control-lib
 (c) 2023-2024 Pierre Thibault (pthibault@units.it)
 """
 import os
+import re
 from datetime import datetime
 import time
 import threading
@@ -31,12 +32,28 @@ logtags = {'type': 'manager',
 
 _client = []
 
+# Next available scan number per experiment path, stored as {exp_path: (st_mtime_ns, next_scan)}
+_scan_cache = {}
 
-def getManager():
+
+def scan_number_from_name(name):
+    """
+    Return the scan number of a scan directory name (format %06d or %06d_some_label),
+    or None if name does not start with one.
+    """
+    number = name[:6]
+    if len(number) == 6 and number.isdigit() and number.isascii():
+        return int(number)
+    return None
+
+
+def getManager(refresh=False):
     """
     A convenience function to return the current client (or a new one) for the Manager daemon.
+
+    If refresh is True, a new connection attempt is made even if a client already exists.
     """
-    if _client and _client[0]:
+    if _client and _client[0] and not refresh:
         return _client[0]
     d = client_or_None('manager', admin=False, client_name=f'client-{get_config()["this_host"]}')
     _client.clear()
@@ -53,6 +70,7 @@ class Manager(DriverBase):
 
     # Allowed characters for experiment and investigation names
     _VALID_CHAR = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_-:'
+    _VALID_NAME = re.compile(f'[{re.escape(_VALID_CHAR)}]+')
     # Interval at which attempts are made at connecting clients
     CLIENT_LOOP_INTERVAL = 20.
 
@@ -81,7 +99,9 @@ class Manager(DriverBase):
         self._scan_name = None
         self._label = None
         self._base_file_name = None
+        self._scan_info = None
         self._next_scan = None
+        self._today = (None, None)   # (date, formatted date) used in scan names
 
         try:
             self._scan_number = self.next_scan()
@@ -257,33 +277,46 @@ class Manager(DriverBase):
         if self._running:
             raise RuntimeError(f'Scan {self.scan_name} already running')
 
+        # Resolve the configuration-backed properties once
+        investigation = self.investigation
+        experiment = self.experiment
+        path = self.path
+        exp_path = os.path.join(get_config()['data_path'], path)
+
         # Get new scan number
-        self._scan_number = self.next_scan()
+        self._scan_number = self._find_next_scan(exp_path)
 
-        # Create scan name
-        today = datetime.now().strftime('%y-%m-%d')
+        # Create scan name (the date string is formatted only once per day)
+        date = datetime.now().date()
+        if self._today[0] != date:
+            self._today = (date, date.strftime('%y-%m-%d'))
+        today = self._today[1]
 
         scan_name = f'{self._scan_number:06d}_{today}'
         if label is not None:
             scan_name += f'_{label}'
 
         self._scan_name = scan_name
-        self._base_file_name = scan_name + '_{0:06d}'
+        self._base_file_name = scan_name.replace('%', '%%') + '_%06d'
 
         self._running = True
         self._label = label
         self.counter = 0
 
         # Create path (ok even if on control host)
-        os.makedirs(os.path.join(get_config()['data_path'], self.path, scan_name), exist_ok=True)
+        os.makedirs(os.path.join(exp_path, scan_name), exist_ok=True)
 
-        scan_info = {'scan_number': self._scan_number,
-                'scan_name': scan_name,
-                'investigation': self.investigation,
-                'experiment': self.experiment,
-                'path': self.path}
+        # We know the next scan number: update the cache rather than scanning the directory again
+        _scan_cache[exp_path] = (os.stat(exp_path).st_mtime_ns, self._scan_number + 1)
 
-        return scan_info
+        # These values cannot change while the scan is running: store them for end_scan
+        self._scan_info = {'scan_number': self._scan_number,
+                           'scan_name': scan_name,
+                           'investigation': investigation,
+                           'experiment': experiment,
+                           'path': path}
+
+        return dict(self._scan_info)
 
     @proxycall()
     def end_scan(self):
@@ -293,22 +326,44 @@ class Manager(DriverBase):
         if not self._running:
             raise RuntimeError(f'No scan currently running')
         self._running = False
-        return {'scan_number': self._scan_number,
-                'scan_name': self._scan_name,
-                'investigation': self.investigation,
-                'experiment': self.experiment,
-                'path': self.path,
-                'count': self.counter
-                 }
+        scan_info = dict(self._scan_info)
+        scan_info['count'] = self.counter
+        return scan_info
 
     @proxycall()
     def status(self):
         """
         Summary of current configuration as a string
         """
-        s = f' * Investigation: {self.investigation}\n'
-        s += f' * Experiment: {self.experiment}\n'
+        return self._format_status(self.investigation, self.experiment, self.next_scan())
+
+    @proxycall()
+    def full_status(self):
+        """
+        Return in a single call a dictionary with the status summary and the state of the current scan,
+        which otherwise requires one call per property.
+        """
+        investigation = self.investigation
+        experiment = self.experiment
         ns = self.next_scan()
+        running = self._running
+        return {'status': self._format_status(investigation, experiment, ns),
+                'investigation': investigation,
+                'experiment': experiment,
+                'next_scan': ns,
+                'scanning': running,
+                'scan_name': self._scan_name if running else None,
+                'scan_number': self._scan_number if running else None,
+                'scan_path': os.path.join(investigation, experiment, self._scan_name) if running else None,
+                'counter': self.counter}
+
+    @staticmethod
+    def _format_status(investigation, experiment, ns):
+        """
+        Status summary string from already resolved values.
+        """
+        s = f' * Investigation: {investigation}\n'
+        s += f' * Experiment: {experiment}\n'
         s += f' * Last scan number: {"[none]" if (ns is None or ns==0) else ns-1}'
         return s
 
@@ -319,7 +374,7 @@ class Manager(DriverBase):
         """
         if not self._running:
             raise RuntimeError(f'No scan currently running')
-        prefix = self._base_file_name.format(self.counter)
+        prefix = self._base_file_name % self.counter
         self.counter += 1
         return prefix
 
@@ -340,8 +395,29 @@ class Manager(DriverBase):
             exp_path = os.path.join(get_config()['data_path'], self.path)
         except RuntimeError as e:
             return None
-        scan_numbers = [int(f.name[:6]) for f in os.scandir(exp_path) if f.is_dir()]
-        return max(scan_numbers, default=-1) + 1
+        return self._find_next_scan(exp_path)
+
+    def _find_next_scan(self, exp_path):
+        """
+        Return the next available scan number in exp_path, listing the directory only if
+        it changed since the last call.
+        """
+        # The directory modification time changes whenever a scan directory is added or removed
+        try:
+            mtime = os.stat(exp_path).st_mtime_ns
+        except FileNotFoundError:
+            # No experiment directory yet, so no scan either (start_scan creates it)
+            return 0
+        cached = _scan_cache.get(exp_path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        # Entries that do not start with a 6-digit scan number are skipped
+        with os.scandir(exp_path) as it:
+            numbers = (scan_number_from_name(f.name) for f in it if f.is_dir(follow_symlinks=False))
+            ns = max((n for n in numbers if n is not None), default=-1) + 1
+        _scan_cache[exp_path] = (mtime, ns)
+        return ns
 
     def _check_path(self):
         """
@@ -349,11 +425,10 @@ class Manager(DriverBase):
         """
         try:
             full_path = os.path.join(get_config()['data_path'], self.path)
-            if os.path.exists(full_path):
-                self.logger.info(f'Path {full_path} selected (exists).')
-            else:
-                os.makedirs(full_path, exist_ok=True)
-                self.logger.info(f'Created path {full_path}.')
+            os.makedirs(full_path)
+            self.logger.info(f'Created path {full_path}.')
+        except FileExistsError:
+            self.logger.info(f'Path {full_path} selected (exists).')
         except RuntimeError as e:
             self.logger.warning(str(e))
 
@@ -361,7 +436,7 @@ class Manager(DriverBase):
         """
         Confirm that the given string can be used as part of a path
         """
-        return all(c in self._VALID_CHAR for c in s)
+        return self._VALID_NAME.fullmatch(s) is not None
 
     @proxycall()
     @property
@@ -387,6 +387,10 @@ class ProxyClientBase:
         # Create logger
         self.logger = rootlogger.getChild(self.__class__.__name__)
 
+        # Property values from the server for properties declared with cache_ttl,
+        # stored as (value, time.monotonic()) pairs
+        self._property_cache = {}
+
         # rpyc connection
         self.conn = None
         self.serving_thread = None
@@ -542,25 +546,35 @@ class ProxyClientBase:
         self.stats['last_reply_time'] = t0
 
     @classmethod
-    def _new_property(cls, name, doc):
+    def _new_property(cls, name, doc, cache_ttl=0):
         """
         Add property to subclass, connected to remote object call.
 
         Parameters:
         name (str): property name
         doc (str): doc string
+        cache_ttl (float): if non-zero, values read from the server are reused
+                           for cache_ttl seconds.
         """
 
         # Create getter
         def fget(client_self):
+            if cache_ttl:
+                cached = client_self._property_cache.get(name)
+                if cached is not None and time.monotonic() - cached[1] < cache_ttl:
+                    return cached[0]
             t0 = time.time()
             method = getattr(client_self.conn.root, f"_get_{name}")
             reply = _um(method())
             client_self._update_stats(t0, time.time())
+            if cache_ttl:
+                client_self._property_cache[name] = (reply["result"], time.monotonic())
             return reply["result"]
 
         # Create setter
         def fset(client_self, value):
+            # Setting any property might change the value of other ones
+            client_self._property_cache.clear()
             t0 = time.time()
             method = getattr(client_self.conn.root, f"_set_{name}")
             method(_m(value))
@@ -589,6 +603,7 @@ class ProxyClientBase:
         if block:
             # In blocking mode, we just request the result and wait
             def method(client_self, *args, **kwargs):
+                client_self._property_cache.clear()
                 t0 = time.time()
                 service_method = getattr(client_self.conn.root, name)
                 reply = _um(service_method(_m(args), _m(kwargs)))
@@ -599,6 +614,8 @@ class ProxyClientBase:
             # In non-blocking mode, we have to wait for result
             # and catch keyboard interrupts to try and abort the command
             def method(client_self, *args, **kwargs):
+                client_self._property_cache.clear()
+
                 # Find remote method to call
                 service_method = getattr(client_self.conn.root, name)
 
@@ -923,7 +940,7 @@ class proxycall:
     Decorator to tag a method or property to be exposed for remote access.
     """
 
-    def __init__(self, admin=False, block=True, interrupt=False, **kwargs):
+    def __init__(self, admin=False, block=True, interrupt=False, cache_ttl=0, **kwargs):
         """
         Decorator to tag a method or property to be exposed for remote access.
 
@@ -932,11 +949,15 @@ class proxycall:
         block (bool): Wait for the function to return.
         interrupt (bool): if True, declare this method as the method to call
                           when SIG_INT is caught on client side.
+        cache_ttl (float): properties only: clients reuse the value read from the
+                           server for this many seconds. The cache is cleared
+                           whenever the client sets a property or calls a method.
         kwargs: anything else that might be needed in the future.
         """
         self.admin = admin
         self.block = block
         self.interrupt = interrupt
+        self.cache_ttl = cache_ttl
         self.kwargs = kwargs
 
     def __call__(self, f):
@@ -949,6 +970,7 @@ class proxycall:
             "admin": self.admin,
             "block": self.block,
             "interrupt": self.interrupt,
+            "cache_ttl": self.cache_ttl,
         }
         api_info.update(self.kwargs)
         if type(f) is property:
@@ -1027,7 +1049,7 @@ class proxydevice:
             doc = api_info["doc"] or ""
             try:
                 if api_info["property"]:
-                    Client._new_property(name, doc)
+                    Client._new_property(name, doc, cache_ttl=api_info.get("cache_ttl", 0))
                     logger.debug(f"Added property {name} to client proxy.")
                 else:
                     Client._new_method(name, doc, signature, block=api_info["block"])
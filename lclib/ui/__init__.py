@@ -6,6 +6,15 @@ This file is part of lab-control-lib
 """
 
 from .uitools import is_interactive, ask, ask_yes_no, user_prompt
-from . import viewers
 from .spec_magics import activate as activate_spec_magics
-from .ui import init, Scan, choose_experiment, choose_investigation
\ No newline at end of file
+from .ui import init, Scan, choose_experiment, choose_investigation
+
+
+def __getattr__(name):
+    """
+    Import the viewers (and with them napari and Qt) only when they are first needed.
+    """
+    if name == 'viewers':
+        import importlib
+        return importlib.import_module('.viewers', __name__)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -122,28 +122,50 @@ def load_past_investigations(path=None):
 
     investigations = {}
 
-    all_inv = {f.name: f.path for f in os.scandir(path) if f.is_dir()}
-    for inv, inv_path in all_inv.items():
-        all_exp = {f.name: f.path for f in os.scandir(inv_path) if f.is_dir()}
-        exp_dict = {}
-        for exp, exp_path in all_exp.items():
-            # Scan directories are of the format %05d or %05d_some_label
-            all_scans = {}
-            for f in os.scandir(exp_path):
-                if f.is_dir():
-                    try:
-                        all_scans[int(f.name[:6])] = f.name
-                    except ValueError:
-                        print(f'{f.name} is an alien directory. Ignored.')
-            exp_dict[exp] = all_scans
-
-        # This updates the module-level dictionary
-        investigations[inv] = exp_dict
+    # Single pass over each level, closing each directory iterator as soon as it is consumed
+    with os.scandir(path) as inv_entries:
+        for inv in inv_entries:
+            # Hidden entries cannot be investigations ('.' is not a valid name character)
+            if inv.name[:1] == '.' or not inv.is_dir(follow_symlinks=False):
+                continue
+            exp_dict = {}
+            with os.scandir(inv.path) as exp_entries:
+                for exp in exp_entries:
+                    if exp.name[:1] == '.' or not exp.is_dir(follow_symlinks=False):
+                        continue
+                    # Scan directories are of the format %06d or %06d_some_label
+                    all_scans = {}
+                    with os.scandir(exp.path) as scan_entries:
+                        for f in scan_entries:
+                            if not f.is_dir(follow_symlinks=False):
+                                continue
+                            number = manager.scan_number_from_name(f.name)
+                            if number is not None:
+                                all_scans[number] = f.name
+                            else:
+                                print(f'{f.name} is an alien directory. Ignored.')
+                    exp_dict[exp.name] = all_scans
+
+            # This updates the module-level dictionary
+            investigations[inv.name] = exp_dict
 
     globals()['INVESTIGATIONS'] = investigations
     return investigations
 
 
+def list_experiments(inv, path=None):
+    """
+    Return the names of the existing experiments of investigation `inv`
+    (an empty list if the investigation has no directory yet).
+    """
+    inv_path = os.path.join(path or get_config()['data_path'], inv)
+    try:
+        with os.scandir(inv_path) as entries:
+            return [f.name for f in entries if f.name[:1] != '.' and f.is_dir(follow_symlinks=False)]
+    except FileNotFoundError:
+        return []
+
+
 def choose_investigation(name=None):
     """
     Interactive selection of investigation name.
@@ -180,26 +202,19 @@ def choose_experiment(name=None, inv=None):
     If non-interactive and `name` is not None: select/create
     experiment with name `name`.
     """
-    # Load past investigations if needed
-    if not INVESTIGATIONS:
-        load_past_investigations(get_config()['data_path'])
-
     # Use global investigation name if none was provided
     if inv is None:
         inv = manager.getManager().investigation
 
-    # This will break if inv is not a key of investigations
-    # So be it. Create one first.
-    experiments = INVESTIGATIONS[inv]
-
     # Now select or create new experiment
     if name is not None:
         exp = name
     else:
-        if not experiments:
+        # Only the experiment names are needed: no need to walk the scans of the whole data tree
+        expkeys = list_experiments(inv)
+        if not expkeys:
             exp = user_prompt('Enter new experiment name:')
         else:
-            expkeys = list(experiments.keys())
             values = list(range(len(expkeys) + 1))
             labels = ['0) [new experiment]'] + [f'{i+1}) {v}' for i, v in enumerate(expkeys)]
             ichoice = ask('Select experiment:', clab=labels, cval=values, multiline=True)
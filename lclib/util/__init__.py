@@ -1,4 +1,11 @@
 from datetime import datetime
+import json
+
+# orjson is optional: faster serialization, falling back to json
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 def now():
     return str(datetime.today())
@@ -6,6 +13,26 @@ def now():
 def utcnow():
     return datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S.%fZ')
 
+def json_dumps(obj) -> bytes:
+    """
+    Serialize obj to JSON bytes, using orjson if available.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # e.g. integers too large for orjson
+            pass
+    return json.dumps(obj).encode()
+
+def json_loads(s):
+    """
+    Deserialize JSON str or bytes, using orjson if available.
+    """
+    if orjson is not None:
+        return orjson.loads(s)
+    return json.loads(s)
+
 from .filedict import FileDict
 from .datalogger import DataLogger
 from .future import Future
@@ -10,7 +10,7 @@ import os
 import os.path
 import numpy as np
 import copy
-from queue import SimpleQueue, Empty
+from collections import deque
 import threading
 
 from .. import FramePublisher
@@ -20,13 +20,21 @@ from .. import h5write
 
 __all__ = ['FrameWriter', 'FrameStreamer']
 
+# Target size of HDF5 chunks when computed from the frame shape
+DEFAULT_CHUNK_BYTES = 1 << 20
+
 
 class FrameWorker:
     logger = rootlogger.getChild('FrameWorker')
 
-    def __init__(self, *args, **kwargs):
+    # Maximum number of pending items (None: unbounded). When full, the oldest item is dropped.
+    QUEUE_MAXLEN = None
+
+    def __init__(self, *args, release=None, **kwargs):
 
-        self.queue = SimpleQueue()
+        self.release = release
+        self.queue = deque(maxlen=self.QUEUE_MAXLEN)
+        self._queue_cond = threading.Condition()
         self._terminate = False
 
         # Start loop
@@ -38,12 +46,13 @@ class FrameWorker:
         """
         self.logger.debug("Entered worker loop")
         while True:
-            try:
-                item = self.queue.get(timeout=.5)
-            except Empty:
-                if self._terminate:
+            with self._queue_cond:
+                while not (self.queue or self._terminate):
+                    self._queue_cond.wait()
+                # Pending items are processed before terminating
+                if not self.queue:
                     break
-                continue
+                item = self.queue.popleft()
             try:
                 self._process_data(item)
             except:
@@ -66,16 +75,36 @@ class FrameWorker:
         """
         pass
 
+    def _release(self, datas):
+        """
+        Hand frames back to their owner once the worker is done with them.
+        Args:
+            datas: a list of frames
+        """
+        if self.release is None:
+            return
+        for data in datas:
+            self.release(data)
+
     def new_data(self, data):
         """
         Add data to queue.
         Args:
-            data: New data to process
+            data: New (datas, metas) item to process
         """
-        self.queue.put(data)
+        dropped = None
+        with self._queue_cond:
+            if self.queue.maxlen is not None and len(self.queue) == self.queue.maxlen:
+                dropped = self.queue.popleft()
+            self.queue.append(data)
+            self._queue_cond.notify()
+        if dropped is not None:
+            self._release(dropped[0])
 
     def close(self):
-        self._terminate = True
+        with self._queue_cond:
+            self._terminate = True
+            self._queue_cond.notify()
 
     def __del__(self):
         self.close()
@@ -87,35 +116,47 @@ class HDF5Worker(FrameWorker):
     """
     logger = rootlogger.getChild('HDF5Worker')
 
-    def __init__(self, filename):
+    # Default HDF5 chunk cache: at least 1 MB (HDF5 default) or one chunk, with a prime number of slots
+    RDCC_NBYTES = 1 << 20
+    RDCC_NSLOTS = 10007
+
+    def __init__(self, filename, chunks=None, rdcc_nbytes=None, release=None):
 
         # Prepare path on the main thread to catch errors.
         b, f = os.path.split(filename)
         os.makedirs(b, exist_ok=True)
 
         self.filename = filename
+        self.chunks = chunks
+        self.rdcc_nbytes = rdcc_nbytes or self.RDCC_NBYTES
         self.frames = []
         self.meta = []
 
         # Start worker
-        super().__init__()
+        super().__init__(release=release)
 
     def _process_data(self, item):
         """
-        Add frame and metadata to internal list
+        Add frames and metadata to internal list
         Args:
-            item: (data, meta)
+            item: (datas, metas) lists of frames and metadata
         """
-        data, meta = item
-        self.frames.append(data)
-        self.meta.append(meta)
+        datas, metas = item
+        self.frames.extend(datas)
+        self.meta.extend(metas)
 
     def _finalize(self):
         """
         Store to file
         """
         data = np.array(self.frames)
-        h5write(filename=self.filename, meta=self.meta, data=data)
+        # Frames have been copied: the buffers can be reused
+        self._release(self.frames)
+        rdcc_nbytes = self.rdcc_nbytes
+        if self.chunks is not None:
+            rdcc_nbytes = max(rdcc_nbytes, int(np.prod(self.chunks)) * data.itemsize)
+        h5write(filename=self.filename, meta=self.meta, data=data, chunks=self.chunks,
+                rdcc_nbytes=rdcc_nbytes, rdcc_nslots=self.RDCC_NSLOTS)
         self.logger.debug(f"{len(self.frames)} frames saved to {self.filename}")
 
 
@@ -125,24 +166,39 @@ class StreamWorker(FrameWorker):
     """
     logger = rootlogger.getChild('StreamWorker')
 
-    def __init__(self, broadcast_port):
+    # Only the most recent frame is worth publishing: older pending frames are dropped
+    QUEUE_MAXLEN = 1
+
+    def __init__(self, broadcast_port, release=None):
 
         self.broadcast_port = broadcast_port
         self.broadcaster = FramePublisher(port=self.broadcast_port)
+        # Frames zmq may still be sending from (published without copy)
+        self._in_flight = []
 
         # Start worker
-        super().__init__()
+        super().__init__(release=release)
 
     def _process_data(self, item):
         """
-        Add frame and metadata to internal list
+        Publish the last frame of the item
         Args:
-            item: (data, meta)
+            item: (datas, metas) lists of frames and metadata. The frames are passed
+                  to self.release once zmq does not refer to them anymore.
         """
-        data, meta = item
+        # Only the most recent frame is worth publishing
+        datas, metas = item
         self.logger.debug('Publishing new frame')
-        self.broadcaster.pub(data, meta)
-        self.logger.debug('Done publishing new frame')
+        tracker = self.broadcaster.pub_tracker
+        try:
+            self.broadcaster.pub(datas[-1], metas[-1])
+            self.logger.debug('Done publishing new frame')
+            if self.broadcaster.pub_tracker is not tracker:
+                # A new send started, so the previous one is complete
+                datas, self._in_flight = self._in_flight, datas
+        finally:
+            # Release frames that zmq does not refer to
+            self._release(datas)
 
     def _finalize(self):
         """
@@ -152,6 +208,8 @@ class StreamWorker(FrameWorker):
             self.broadcaster.close()
         except:
             pass
+        self._release(self._in_flight)
+        self._in_flight = []
 
 
 class FrameConsumer:
@@ -160,11 +218,15 @@ class FrameConsumer:
     """
     WORKER = FrameWorker
 
-    def __init__(self):
+    def __init__(self, release=None):
         """
         Prepare queue
+        Args:
+            release: optional callable invoked with each stored frame once
+                     the consumer does not need it anymore
         """
         self.logger = rootlogger.getChild(self.__class__.__name__)
+        self.release = release
         self.workers = []
         self._store_lock = threading.Lock()
 
@@ -172,7 +234,7 @@ class FrameConsumer:
         """
         Initiate a new FrameWorker and add it to the worker list
         """
-        self.workers.append(self.WORKER(*args, **kwargs))
+        self.workers.append(self.WORKER(*args, release=self.release, **kwargs))
         N = len(self.workers)
         if N > 2:
             self.logger.warning(f'{N} elements in worker list!')
@@ -185,17 +247,27 @@ class FrameConsumer:
             data: a numpy frame
             meta: a dictionary of metadata
 
+        Returns:
+            Nothing
+        """
+        self.store_batch([data], [meta])
+
+    def store_batch(self, datas, metas):
+        """
+        Request multiple frames to be stored at once.
+
+        Args:
+            datas: a list of numpy frames
+            metas: a list of metadata dictionaries (or None), one per frame
+
         Returns:
             Nothing
         """
         with self._store_lock:
-            if meta is None:
-                meta = {}
-            else:
-                meta = copy.deepcopy(meta)
+            metas = [{} if meta is None else copy.deepcopy(meta) for meta in metas]
 
             # The active worker is the last one
-            self.workers[-1].new_data((data, meta))
+            self.workers[-1].new_data((datas, metas))
 
     def close_worker(self):
         with self._store_lock:
@@ -209,16 +281,27 @@ class FrameConsumer:
 class FrameWriter(FrameConsumer):
     WORKER = HDF5Worker
 
-    def __init__(self):
-        super().__init__()
+    def __init__(self, release=None):
+        super().__init__(release=release)
 
-    def open(self, filename):
+    def open(self, filename, chunks=None, shape=None, dtype=None, chunk_bytes=DEFAULT_CHUNK_BYTES):
         """
         Start new worker
         Args:
             filename: the file to save to
+            chunks: HDF5 chunk shape for the frame stack (None: computed from
+                    shape and dtype if provided, automatic otherwise)
+            shape: the shape of a frame
+            dtype: the frame data type
+            chunk_bytes: target chunk size when chunks are computed from shape and dtype
         """
-        self.start_worker(filename=filename)
+        rdcc_nbytes = None
+        if shape is not None and dtype is not None:
+            frame_bytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+            if chunks is None and frame_bytes:
+                chunks = (max(1, chunk_bytes // frame_bytes),) + tuple(shape)
+            rdcc_nbytes = max(8 * chunk_bytes, 32 << 20)
+        self.start_worker(filename=filename, chunks=chunks, rdcc_nbytes=rdcc_nbytes)
 
     def close(self):
         self.close_worker()
@@ -230,11 +313,11 @@ class FrameStreamer(FrameConsumer):
     """
     WORKER = StreamWorker
 
-    def __init__(self, broadcast_port):
+    def __init__(self, broadcast_port, release=None):
         """
         Frame publisher.
         """
-        super().__init__()
+        super().__init__(release=release)
         self.broadcast_port = broadcast_port
 
     def on(self):
@@ -12,6 +12,12 @@ fw.open(filename)           # Prepare to save a new file
 fw.store(data, meta)        # Pass data through shared memory
 fw.close()                  # Store data to file.
 
+The shared buffer is split in NUM_SLOTS slots. Each call to store copies the frame
+in the next slot and sends only the slot index, shape, dtype and metadata to the
+remote process. A frame larger than a slot occupies as many consecutive slots as
+needed, up to the whole buffer. The call is asynchronous: a slot is reused only
+once the remote process confirmed that it copied the data out of it.
+
 This file is part of lab-control-lib
 (c) 2023-2024 Pierre Thibault (pthibault@units.it)
 """
@@ -22,7 +28,7 @@ import signal
 import pickle
 import os
 
-from .frameconsumer import FrameWriter, FrameStreamer
+from .frameconsumer import FrameWriter, FrameStreamer, DEFAULT_CHUNK_BYTES
 
 # This is a way to make the code compatible with python 3.7 using the backport (pip install shared-memory38)
 try:
@@ -35,6 +41,10 @@ from . import logger as rootlogger
 # 100 varex full frames
 BUFFERSIZE = 100 * 2 * 1536 * 1944
 
+# Number of slots the shared buffer is split in
+NUM_SLOTS = 8
+SLOTSIZE = BUFFERSIZE // NUM_SLOTS
+
 shared_buffers = {}
 
 def create_shared_buffer(array_name, buffersize=BUFFERSIZE):
@@ -50,11 +60,11 @@ def create_shared_buffer(array_name, buffersize=BUFFERSIZE):
     return data_buffer
 
 
-def get_array(array_name, shape=None, dtype=None):
+def get_array(array_name, shape=None, dtype=None, slot=0):
     """
-    Return an array whose underlying buffer is the shared buffer.
+    Return an array whose underlying buffer is the given slot of the shared buffer.
     """
-    return np.ndarray(shape=shape, dtype=dtype, buffer=shared_buffers[array_name].buf)
+    return np.ndarray(shape=shape, dtype=dtype, buffer=shared_buffers[array_name].buf, offset=slot*SLOTSIZE)
 
 
 def _m(obj):
@@ -77,21 +87,61 @@ class FrameConsumerProcess:
     """
     PORT = 18459
 
-    def __init__(self):
+    def __init__(self, release=None):
         self.logger = rootlogger.getChild(self.__class__.__name__)
+        self.release = release
         self.data_buffer = create_shared_buffer(self.__class__.__name__)
         self.conn = None
         self.proc = None
+        self._pending = [None] * NUM_SLOTS   # Async results of the calls using each slot
+        self._next_slot = 0
         self._start_server()
 
     def store(self, data, meta):
         """
         Send data and metadata
         """
+        if data.nbytes > BUFFERSIZE:
+            raise RuntimeError(f'Frame too large for shared memory buffer ({data.nbytes} > {BUFFERSIZE} bytes)')
+
+        # Large frames span several consecutive slots
+        nslots = max(1, -(-data.nbytes // SLOTSIZE))
+        slot = self._next_slot
+        if slot + nslots > NUM_SLOTS:
+            slot = 0
+        self._next_slot = (slot + nslots) % NUM_SLOTS
+
+        # Wait until the remote process is done with these slots
+        for s in range(slot, slot + nslots):
+            self._release(s)
+
         shape = data.shape
         dtype = str(data.dtype)
-        get_array(self.__class__.__name__, shape=shape, dtype=dtype)[:] = data[:]
-        self.conn.root.new_data(shape, dtype, _m(meta))
+        np.copyto(get_array(self.__class__.__name__, shape=shape, dtype=dtype, slot=slot), data)
+        # The frame is in shared memory: the buffer can be reused
+        if self.release is not None:
+            self.release(data)
+        result = rpyc.async_(self.conn.root.new_data)(slot, shape, dtype, _m(meta))
+        for s in range(slot, slot + nslots):
+            self._pending[s] = result
+
+    def _release(self, slot):
+        """
+        Wait for the completion of the remote call using the given slot. Errors on the remote side are raised here.
+        """
+        pending = self._pending[slot]
+        if pending is None:
+            return
+        self._pending[slot] = None
+        # Accessing value waits for the reply and raises remote errors
+        pending.value
+
+    def _flush(self):
+        """
+        Wait for all pending remote calls to complete.
+        """
+        for slot in range(NUM_SLOTS):
+            self._release(slot)
 
     def _start_server(self):
         """
@@ -134,27 +184,32 @@ class FrameWriterProcess(FrameConsumerProcess):
     """
     PORT = 18460
 
-    def __init__(self):
-        super().__init__()
+    def __init__(self, release=None):
+        super().__init__(release=release)
 
-    def open(self, filename):
+    def open(self, filename, chunks=None, shape=None, dtype=None, chunk_bytes=DEFAULT_CHUNK_BYTES):
         """
         Connect to remote service
         Args:
             filename: where to save data
+            chunks, shape, dtype, chunk_bytes: see FrameWriter.open
         """
+        self._flush()
         self.conn = rpyc.connect(host="localhost", port=self.PORT)
 
         # Prepare path on the main process to catch errors.
         b, f = os.path.split(filename)
         os.makedirs(b, exist_ok=True)
 
-        self.conn.root.open(filename)
+        if dtype is not None:
+            dtype = str(np.dtype(dtype))
+        self.conn.root.open(filename, chunks, shape, dtype, chunk_bytes)
 
     def close(self):
         """
         Close current request.
         """
+        self._flush()
         self.conn.root.close()
 
 
@@ -164,9 +219,9 @@ class FrameStreamerProcess(FrameConsumerProcess):
     """
     PORT = 18461
 
-    def __init__(self, broadcast_port):
+    def __init__(self, broadcast_port, release=None):
         self.broadcast_port = broadcast_port
-        super().__init__()
+        super().__init__(release=release)
 
     def on(self):
         """
@@ -174,6 +229,7 @@ class FrameStreamerProcess(FrameConsumerProcess):
         Args:
             broadcast_port: the port for frame publishing
         """
+        self._flush()
         self.conn = rpyc.connect(host="localhost", port=self.PORT)
 
         self.conn.root.on(self.broadcast_port)
@@ -182,6 +238,7 @@ class FrameStreamerProcess(FrameConsumerProcess):
         """
         Close current request.
         """
+        self._flush()
         self.conn.root.off()
 
 
@@ -192,11 +249,11 @@ class FrameConsumerRemoteService(rpyc.Service):
         self.conn = conn
         super().on_connect(conn)
 
-    def exposed_new_data(self, shape, dtype, meta):
+    def exposed_new_data(self, slot, shape, dtype, meta):
         """
         Receive metadata and info to retrieve shared memory
         """
-        data = get_array(self.cname, shape=shape, dtype=dtype).copy()
+        data = get_array(self.cname, shape=shape, dtype=dtype, slot=slot).copy()
         meta = _um(meta)
         self.process_frame(data=data, meta=meta)
 
@@ -209,11 +266,11 @@ class FrameWriterRemoteService(FrameConsumerRemoteService):
         super().on_connect(conn)
         self.frame_writer = FrameWriter()
 
-    def exposed_open(self, filename):
+    def exposed_open(self, filename, chunks=None, shape=None, dtype=None, chunk_bytes=DEFAULT_CHUNK_BYTES):
         """
         Open frame writer
         """
-        self.frame_writer.open(filename=filename)
+        self.frame_writer.open(filename=filename, chunks=chunks, shape=shape, dtype=dtype, chunk_bytes=chunk_bytes)
 
     def process_frame(self, data, meta):
         """
@@ -103,6 +103,9 @@ def _h5write(filename, mode, *args, **kwargs):
         kwargs.pop('compress')
     else:
         compress = True # this is the default value
+    chunks = kwargs.pop('chunks', None) # chunk shape for arrays of matching dimension
+    # chunk cache parameters, used only when opening the file
+    file_kwargs = {k: kwargs.pop(k) for k in ('rdcc_nbytes', 'rdcc_nslots') if k in kwargs}
     d.update(kwargs) # append kwargs to the input dictionary
 
     # List of object ids to make sure we are not saving something twice.
@@ -122,10 +125,15 @@ def _h5write(filename, mode, *args, **kwargs):
 
     # @sdebug
     def _store_numpy(group, a, name, compress):
+        if chunks is not None and a.ndim == len(chunks) and a.size:
+            # Chunks cannot be larger than the dataset
+            achunks = tuple(min(c, n) for c, n in zip(chunks, a.shape))
+        else:
+            achunks = None
         if compress:
-            dset = group.create_dataset(name, data=a, compression='gzip')
+            dset = group.create_dataset(name, data=a, compression='gzip', chunks=achunks)
         else:
-            dset = group.create_dataset(name, data=a)
+            dset = group.create_dataset(name, data=a, chunks=achunks)
         dset.attrs['type'] = 'array'
         return dset
 
@@ -276,7 +284,7 @@ def _h5write(filename, mode, *args, **kwargs):
         base = os.path.split(filename)[0]
         if not os.path.exists(base):
             os.makedirs(base)
-        f = h5py.File(filename, mode)
+        f = h5py.File(filename, mode, **file_kwargs)
     else:
         f = filename
 
@@ -304,12 +312,18 @@ def h5write(filename, *args, **kwargs):
     h5write(filename, var1=..., var2=..., ...)
     h5write(filename, dict, var1=..., var2=...)
     h5write(filename, dict, compress=True, var1=..., var2=...)
+    h5write(filename, dict, chunks=(16, 256, 256), var1=..., var2=...)
 
     Writes variables var1, var2, ... to file filename. The key-value
     arguments have precedence on the provided dictionary.
     A boolean parameter named 'compress' can be passed inside kwargs.
     If True GZIP level 4 compression is used, if False compression is off.
     Default is True.
+    A tuple named 'chunks' can be passed inside kwargs. It is used as
+    chunk shape for all arrays with the same number of dimensions
+    (clipped to the array shape). Default is None (h5py's choice).
+    The chunk cache size can be set with 'rdcc_nbytes' and 'rdcc_nslots'
+    (see h5py.File).
 
     supported variable types are:
     * scalars
@@ -12,7 +12,7 @@ import numpy as np
 import logging
 import threading
 import time
-from . import Future
+from . import Future, json_dumps, json_loads
 
 class FramePublisher:
     """
@@ -48,30 +48,35 @@ class FramePublisher:
         self.logger.info(f'Broadcasting on {self.address}')
         self.arrays = arrays
 
+        # zmq sockets are not thread safe: the heartbeat and pub share this lock
+        self._send_lock = threading.Lock()
         self._stop_heartbeat = False
         self.heartbeat_future = Future(self._heartbeat)
-        self.pub_future = None
+        self.pub_tracker = None
 
     def pub(self, data, metadata=None):
         """
         Publish frame and metadata.
+
+        The frame buffer is handed to zmq without copy. If zmq is still
+        sending the previous frame, the new one is dropped.
+
         Arguments:
           data: numpy array or buffer (or None)
           metadata: any json-serializable object (probably dictionary).
         """
-        if not self.pub_future or self.pub_future.done():
-            self.pub_future = Future(self._pub, args=(data, metadata))
-        else:
-            print('Still publishing previous frame. Dropping this one.')
-        return
-    
-    def _pub(self, data, metadata=None):
-        """
-        Do the actual publishing on a thread.
-        """
-        if not data.flags['C_CONTIGUOUS']:
+        if self.pub_tracker is not None and not self.pub_tracker.done:
+            self.logger.debug('Still publishing previous frame. Dropping this one.')
+            return
+        if type(data) is np.ndarray and not data.flags['C_CONTIGUOUS']:
             data = np.ascontiguousarray(data)
-        self.zmq_socket.send_frame(data, metadata, copy=False)
+        with self._send_lock:
+            try:
+                self.pub_tracker = self.zmq_socket.send_frame(data, metadata, flags=zmq.NOBLOCK, copy=False, track=True)
+            except zmq.Again:
+                self.logger.debug('Publishing queue full. Dropping frame.')
+            self.last_pub = time.time()
+        return
 
     def _heartbeat(self):
         """
@@ -89,8 +94,9 @@ class FramePublisher:
                 continue
 
             # Send a peep
-            self.zmq_socket.send_frame(None, None)
-            self.last_pub = now
+            with self._send_lock:
+                self.zmq_socket.send_frame(None, None)
+                self.last_pub = now
 
     def close(self):
         """Closes the ZMQ socket and the ZMQ context.
@@ -223,6 +229,9 @@ class SerializingSocket(zmq.Socket):
         """
         Send a buffer or numpy array along with metadata.
 
+        The message has two parts: a JSON header with the metadata and the
+        buffer itself, sent in one multipart call (the header only if A is None).
+
         Arguments:
           A: numpy array or buffer
           meta: the metadata
@@ -241,11 +250,10 @@ class SerializingSocket(zmq.Socket):
         else:
             md['type'] = 'bytes'
 
-        if A is not None:
-            self.send_json(md, flags | zmq.SNDMORE)
-            return self.send(A, flags, copy=copy, track=track)
-        else:
-            return self.send_json(md, flags)
+        header = json_dumps(md)
+        if A is None:
+            return self.send(header, flags)
+        return self.send_multipart([header, A], flags, copy=copy, track=track)
 
 
     def recv_frame(self, flags=0, copy=True, track=False):
@@ -265,11 +273,12 @@ class SerializingSocket(zmq.Socket):
           msg: metadata
         """
 
-        md = self.recv_json(flags=flags)
+        parts = self.recv_multipart(flags=flags, copy=copy, track=track)
+        md = json_loads(parts[0] if copy else parts[0].bytes)
         if md['type'] is None:
             return None, md['meta']
 
-        A = self.recv(flags=flags, copy=copy, track=track)
+        A = parts[1]
         if md['type'] == 'ndarray':
             A = np.frombuffer(A, dtype=md['dtype']).reshape(md['shape'])
         return A, md['meta']
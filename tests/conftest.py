@@ -0,0 +1,160 @@
+"""
+Shared fixtures: a camera that does not need hardware, a fake manager client and
+frame consumers that record what they receive instead of saving or publishing it.
+"""
+import copy
+import time
+
+import pytest
+
+import lclib
+from lclib import manager, camera
+
+
+class FakeManager:
+    """
+    Stand-in for the manager client used by the camera.
+    """
+    def __init__(self):
+        self.scan_path = None
+        self.scan_name = None
+        self.prefix_count = 0
+
+    def next_prefix(self):
+        self.prefix_count += 1
+        return f'{self.scan_name}_{self.prefix_count:06d}'
+
+    def request_meta(self, request_ID, exclude_list=None):
+        pass
+
+    def return_meta(self, request_ID):
+        return {}
+
+
+class RecordingConsumer:
+    """
+    Frame writer/streamer replacement keeping copies of what it receives.
+    Frames are released as soon as they are copied, like the remote consumers.
+    """
+    def __init__(self, release=None):
+        self.release = release
+        self.frames = []
+        self.metas = []
+        self.opened = []
+
+    def store_batch(self, datas, metas):
+        for data, meta in zip(datas, metas):
+            self.frames.append(data.copy())
+            self.metas.append(copy.deepcopy(meta))
+            if self.release is not None:
+                self.release(data)
+
+    def store(self, data, meta=None):
+        self.store_batch([data], [meta])
+
+    def open(self, filename, **kwargs):
+        self.opened.append(filename)
+
+    def close(self):
+        pass
+
+    def on(self):
+        pass
+
+    def off(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+class FakeCamera(camera.CameraBase):
+    """
+    Camera producing SHAPE frames filled with their index in the exposure.
+    """
+    SHAPE = (4, 5)
+    MAX_FPS = 1000.
+    FRAME_DELAY = .001
+    DEFAULT_BROADCAST_ADDRESS = ('localhost', 9599)
+
+    def __init__(self):
+        self.hw = {'exposure_time': .001, 'exposure_number': 2, 'operation_mode': {}, 'binning': (1, 1)}
+        self.shape_reads = 0
+        self.exposure_time_reads = 0
+        self.arm_count = 0
+        super().__init__()
+
+    def _arm(self):
+        self.arm_count += 1
+
+    def _trigger(self):
+        for i in range(self.exposure_number):
+            if self.rolling and self.stop_rolling_flag:
+                break
+            time.sleep(self.FRAME_DELAY)
+            buf = self.get_free_buffer()
+            buf[:] = i
+            self.enqueue_frame(buf, {'frame_counter': i})
+
+    def _get_exposure_time(self):
+        self.exposure_time_reads += 1
+        return self.hw['exposure_time']
+
+    def _set_exposure_time(self, value):
+        self.hw['exposure_time'] = value
+
+    def _get_exposure_number(self):
+        return self.hw['exposure_number']
+
+    def _set_exposure_number(self, value):
+        self.hw['exposure_number'] = value
+
+    def _get_operation_mode(self):
+        return self.hw['operation_mode']
+
+    def set_operation_mode(self, **kwargs):
+        self.hw['operation_mode'] = kwargs
+
+    def _get_binning(self):
+        return self.hw['binning']
+
+    def _set_binning(self, value):
+        self.hw['binning'] = value
+
+    def _get_psize(self):
+        return float(self.hw['binning'][0])
+
+    def _get_shape(self):
+        self.shape_reads += 1
+        b = self.hw['binning']
+        return (self.SHAPE[0] // b[0], self.SHAPE[1] // b[1])
+
+
+@pytest.fixture
+def fake_manager(monkeypatch):
+    man = FakeManager()
+    monkeypatch.setattr(manager, 'getManager', lambda refresh=False: man)
+    return man
+
+
+@pytest.fixture
+def lclib_config(tmp_path, monkeypatch):
+    monkeypatch.setitem(lclib.config, 'conf_path', str(tmp_path / 'conf'))
+    monkeypatch.setitem(lclib.config, 'this_host', 'test')
+    return lclib.config
+
+
+@pytest.fixture
+def cam(tmp_path, lclib_config, fake_manager):
+    """
+    A FakeCamera saving under tmp_path, with recording frame consumers.
+    """
+    cls = type('FakeCamera', (FakeCamera,), {'BASE_PATH': str(tmp_path / 'data')})
+    c = cls()
+    c.live_off()
+    c.frame_writer = RecordingConsumer(release=c.release_buffer)
+    c.frame_streamer = RecordingConsumer(release=c.release_buffer)
+    c.config['do_broadcast'] = False
+    c.config['save_path'] = 'snaps'
+    yield c
+    c.shutdown()
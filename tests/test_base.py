@@ -0,0 +1,80 @@
+"""
+Tests for the socket driver base: reply reception and receive thread wake-up.
+"""
+import socket
+import threading
+import time
+
+import pytest
+
+from lclib.base import SocketDriverBase
+
+
+class EchoServer:
+    """
+    Device replying to each line with the same line. 'SPLIT' is answered in two parts.
+    """
+    def __init__(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.bind(('127.0.0.1', 0))
+        self.sock.listen(1)
+        self.address = self.sock.getsockname()
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+
+    def _serve(self):
+        conn, _ = self.sock.accept()
+        with conn:
+            f = conn.makefile('rb')
+            for line in f:
+                if line == b'SPLIT\n':
+                    conn.sendall(b'PART1 ')
+                    time.sleep(.1)
+                    conn.sendall(b'PART2\n')
+                else:
+                    conn.sendall(line)
+
+    def close(self):
+        self.sock.close()
+
+
+class EchoDriver(SocketDriverBase):
+    def init_device(self):
+        self.initialized = True
+
+
+@pytest.fixture
+def driver(lclib_config):
+    server = EchoServer()
+    d = EchoDriver(device_address=server.address)
+    yield d
+    d.shutdown()
+    server.close()
+
+
+def test_device_cmd(driver):
+    assert driver.device_cmd(b'HELLO\n') == b'HELLO\n'
+    assert driver.device_cmd('WORLD\n') == b'WORLD\n'
+
+
+def test_reply_received_in_parts(driver):
+    # The reply is handed over only once the EOL has arrived
+    assert driver.device_cmd(b'SPLIT\n') == b'PART1 PART2\n'
+
+
+def test_shutdown_wakes_receive_thread(driver):
+    time.sleep(.1)
+    t0 = time.time()
+    driver.shutdown()
+    driver.recv_thread.exception(timeout=2.)
+    # Woken up through the socket pair, not by the select timeout
+    assert time.time() - t0 < .4
+
+
+def test_stop_wakes_receive_thread(driver):
+    time.sleep(.1)
+    t0 = time.time()
+    driver.stop()
+    driver.recv_thread.exception(timeout=2.)
+    assert time.time() - t0 < .4
+    assert not driver.connected
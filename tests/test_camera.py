@@ -0,0 +1,220 @@
+"""
+Tests for the acquisition machinery of CameraBase, run on a camera without hardware.
+"""
+import threading
+import time
+
+import numpy as np
+
+import lclib
+from lclib.camera import CameraBase
+
+
+class FlippingConfig(dict):
+    """
+    Camera configuration whose do_broadcast value flips at every read, as if
+    live_on and live_off were called continuously.
+    """
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        if key == 'do_broadcast':
+            super().__setitem__(key, not value)
+        return value
+
+
+def wait_frames_done(cam, timeout=5.):
+    t0 = time.time()
+    while not cam.frame_queue_empty_flag.is_set():
+        assert time.time() - t0 < timeout, 'Frames were not consumed in time'
+        time.sleep(.01)
+
+
+def assert_pool_free(cam):
+    assert cam._frame_pool
+    assert all(users == 0 for buf, users in cam._frame_pool.values())
+    assert len(cam._free_buffers) == len(cam._frame_pool)
+
+
+def test_broadcast_toggled_while_rolling(cam):
+    cam.config = FlippingConfig(cam.config)
+    cam.roll_on(fps=cam.MAX_FPS)
+    time.sleep(.3)
+    cam.roll_off()
+    wait_frames_done(cam)
+    assert cam.frame_streamer.frames
+    assert_pool_free(cam)
+
+
+def test_register_driver_tracks_cameras(monkeypatch):
+    monkeypatch.setattr(lclib, '_driver_classes', dict(lclib._driver_classes))
+    monkeypatch.setattr(lclib, '_camera_classes', {})
+    # camera.py holds a reference to the dict it fills
+    monkeypatch.setattr(lclib.camera, '_camera_classes', lclib._camera_classes)
+
+    @lclib.register_driver
+    class SomeCamera(CameraBase):
+        pass
+
+    @lclib.register_driver
+    class SomeMotor:
+        pass
+
+    assert lclib._driver_classes['somecamera'] is SomeCamera
+    assert 'somemotor' in lclib._driver_classes
+    assert lclib._camera_classes == {'somecamera': SomeCamera}
+
+
+def test_stack_enqueue(cam):
+    cam.DATATYPE = 'uint16'
+    seen = {}
+
+    def trigger():
+        seen['localmeta'] = cam.localmeta
+        # Let the cached shape expire: enqueue_frame must not read it again
+        time.sleep(2 * cam.GETTER_CACHE_TTL)
+        seen['shape_reads'] = cam.shape_reads
+        stack = np.stack([np.full(cam.SHAPE, i, cam.DATATYPE) for i in range(3)])
+        cam.enqueue_frame(stack, [{'frame_counter': i} for i in range(3)])
+        seen['shape_reads_after'] = cam.shape_reads
+
+    cam._trigger = trigger
+    cam.snap()
+    wait_frames_done(cam)
+    assert seen['shape_reads_after'] == seen['shape_reads']
+    assert [f[0, 0] for f in cam.frame_writer.frames] == [0, 1, 2]
+    assert [m[cam._name_lower]['frame_counter'] for m in cam.frame_writer.metas] == [0, 1, 2]
+    # The dictionaries taken for the stack went back to the pool
+    assert any(d is seen['localmeta'] for d in cam._meta_pool)
+
+
+def test_setter_during_slow_read(cam):
+    read_started = threading.Event()
+    setter_done = threading.Event()
+    get_exposure_time = cam._get_exposure_time
+
+    def slow_get_exposure_time():
+        value = get_exposure_time()
+        read_started.set()
+        setter_done.wait(2.)
+        return value
+
+    cam._invalidate_cached_values()
+    cam._get_exposure_time = slow_get_exposure_time
+    reader = threading.Thread(target=cam.get_meta)
+    reader.start()
+    assert read_started.wait(2.)
+    cam._get_exposure_time = get_exposure_time
+    cam.exposure_time = .5
+    setter_done.set()
+    reader.join()
+
+    # The value read before the setter must not be kept
+    assert cam.exposure_time == .5
+    assert cam.get_meta()['exposure_time'] == .5
+
+
+def test_ring_buffer_blocks_when_full(cam):
+    cam.SNAP_KEEPALIVE = 0
+    gate = threading.Event()
+    store_batch = cam.frame_writer.store_batch
+
+    def blocked_store_batch(datas, metas):
+        gate.wait(5.)
+        store_batch(datas, metas)
+
+    cam.frame_writer.store_batch = blocked_store_batch
+    n = cam.FRAME_RING_SIZE + 4
+    snapper = threading.Thread(target=cam.snap, kwargs={'exp_num': n})
+    snapper.start()
+
+    t0 = time.time()
+    while cam._ring_tail - cam._ring_head < cam.FRAME_RING_SIZE:
+        assert time.time() - t0 < 5., 'Ring buffer did not fill up'
+        time.sleep(.01)
+    tail = cam._ring_tail
+    time.sleep(.1)
+    # The producer waits for a free slot
+    assert cam._ring_tail == tail
+    assert snapper.is_alive()
+
+    gate.set()
+    snapper.join(5.)
+    assert not snapper.is_alive()
+    wait_frames_done(cam)
+    assert [f[0, 0] for f in cam.frame_writer.frames] == list(range(n))
+
+
+def test_buffer_pool_claim_release(cam):
+    cam._reset_frame_pool()
+    buf = cam.get_free_buffer()
+    assert buf.shape == cam.SHAPE
+    cam._claim_buffer(buf, 2)
+    assert cam.get_free_buffer() is not buf
+    cam.release_buffer(buf)
+    assert buf not in cam._free_buffers
+    cam.release_buffer(buf)
+    assert cam._free_buffers[-1] is buf
+    # Extra and foreign releases are ignored
+    cam.release_buffer(buf)
+    cam.release_buffer(buf.copy())
+    assert sum(b is buf for b in cam._free_buffers) == 1
+    assert cam.get_free_buffer() is buf
+
+
+def test_buffer_pool_size_is_bounded(cam):
+    cam._reset_frame_pool()
+    bufs = [cam.get_free_buffer() for _ in range(cam.FRAME_POOL_SIZE + 2)]
+    assert len(cam._frame_pool) == cam.FRAME_POOL_SIZE
+    for buf in bufs:
+        cam._claim_buffer(buf, 0)
+    assert len(cam._free_buffers) == cam.FRAME_POOL_SIZE
+
+
+def test_snap_keepalive(cam):
+    cam.SNAP_KEEPALIVE = .3
+    cam.snap()
+    assert cam.armed
+    cam.snap()
+    # The second snap reused the armed camera
+    assert cam.arm_count == 1
+    time.sleep(.6)
+    assert not cam.armed
+    cam.snap()
+    assert cam.arm_count == 2
+
+
+def test_snap_keepalive_rearms_on_scan_change(cam, fake_manager):
+    cam.SNAP_KEEPALIVE = 2.
+    cam.snap()
+    assert 'snaps' in cam.filename
+    fake_manager.scan_path = fake_manager.scan_name = 'scan_000001'
+    cam.snap()
+    assert cam.arm_count == 2
+    assert 'scan_000001' in cam.filename
+
+
+def test_acquisition_thread_is_persistent(cam):
+    cam.SNAP_KEEPALIVE = 0
+    cam.snap()
+    thread = cam._loop_thread
+    for _ in range(2):
+        cam.arm()
+        cam.snap()
+        cam.disarm()
+    assert cam._loop_thread is thread
+    assert thread.is_alive()
+
+
+def test_getter_cache(cam):
+    cam._invalidate_cached_values()
+    reads = cam.exposure_time_reads
+    cam.exposure_time
+    cam.exposure_time
+    assert cam.exposure_time_reads == reads + 1
+    time.sleep(cam.GETTER_CACHE_TTL * 1.5)
+    cam.exposure_time
+    assert cam.exposure_time_reads == reads + 2
+    # Setters drop cached values
+    cam.exposure_time = .002
+    assert cam.exposure_time == .002
+    assert cam.exposure_time_reads == reads + 3
@@ -0,0 +1,41 @@
+"""
+Tests for the command line helpers.
+"""
+import importlib
+import logging
+
+import click
+import pytest
+from click.testing import CliRunner
+
+import lclib
+
+
+@pytest.fixture
+def loglevel_type(monkeypatch):
+    # The CLI module reads the host configuration set up by init() when imported
+    monkeypatch.setitem(lclib.config, 'this_host', 'test')
+    monkeypatch.setitem(lclib.config, 'local_ip_list', [])
+    return importlib.import_module('lclib.__main__').LogLevel
+
+
+@pytest.mark.parametrize('value, level', [('debug', logging.DEBUG),
+                                          ('WARNING', logging.WARNING),
+                                          ('15', 15),
+                                          (logging.ERROR, logging.ERROR)])
+def test_loglevel_convert(loglevel_type, value, level):
+    assert loglevel_type().convert(value, None, None) == level
+
+
+def test_loglevel_option(loglevel_type):
+    @click.command()
+    @click.option('--loglevel', type=loglevel_type(), default='info')
+    def cmd(loglevel):
+        click.echo(loglevel)
+
+    runner = CliRunner()
+    assert runner.invoke(cmd, []).output.strip() == str(logging.INFO)
+    assert runner.invoke(cmd, ['--loglevel', 'error']).output.strip() == str(logging.ERROR)
+    result = runner.invoke(cmd, ['--loglevel', 'loud'])
+    assert result.exit_code != 0
+    assert 'Unknown log level: loud' in result.output
@@ -0,0 +1,51 @@
+"""
+Tests for the frame consumer workers.
+"""
+import numpy as np
+
+from lclib.util.frameconsumer import frameconsumer
+
+
+class FakePublisher:
+    """
+    FramePublisher replacement. Sends complete immediately unless pub fails.
+    """
+    fail = False
+
+    def __init__(self, port):
+        self.pub_tracker = None
+        self.published = []
+
+    def pub(self, data, metadata=None):
+        if self.fail:
+            raise RuntimeError('Publishing failed')
+        self.published.append(data)
+        self.pub_tracker = object()
+
+    def close(self):
+        pass
+
+
+def run_stream_worker(monkeypatch, items, fail=False):
+    monkeypatch.setattr(FakePublisher, 'fail', fail)
+    monkeypatch.setattr(frameconsumer, 'FramePublisher', FakePublisher)
+    released = []
+    worker = frameconsumer.StreamWorker(broadcast_port=0, release=released.append)
+    for item in items:
+        worker.new_data(item)
+    worker.close()
+    worker.future.exception(timeout=5.)
+    return worker, released
+
+
+def test_stream_worker_releases_published_frames(monkeypatch):
+    frames = [np.full((2, 2), i) for i in range(3)]
+    worker, released = run_stream_worker(monkeypatch, [([f], [{}]) for f in frames])
+    # Whether published or dropped from the queue, every frame is released once
+    assert sorted(id(f) for f in released) == sorted(id(f) for f in frames)
+
+
+def test_stream_worker_releases_on_error(monkeypatch):
+    frame = np.zeros((2, 2))
+    worker, released = run_stream_worker(monkeypatch, [([frame], [{}])], fail=True)
+    assert len(released) == 1 and released[0] is frame
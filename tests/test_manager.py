@@ -0,0 +1,66 @@
+"""
+Tests for the scan numbering of the manager.
+"""
+import os
+
+import pytest
+
+from lclib import manager
+from lclib.manager import Manager, scan_number_from_name
+
+
+@pytest.mark.parametrize('name, number', [('000000', 0),
+                                          ('000012_24-01-01', 12),
+                                          ('000003_24-01-02_label', 3),
+                                          ('12_short', None),
+                                          ('notes', None),
+                                          ('00001x', None),
+                                          ('٠٠٠٠٠١', None)])
+def test_scan_number_from_name(name, number):
+    assert scan_number_from_name(name) == number
+
+
+@pytest.fixture
+def exp_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(manager, '_scan_cache', {})
+    path = tmp_path / 'exp'
+    path.mkdir()
+    return str(path)
+
+
+def find_next_scan(exp_path):
+    # _find_next_scan does not use the instance state
+    return Manager._find_next_scan(None, exp_path)
+
+
+def test_find_next_scan(exp_path):
+    assert find_next_scan(os.path.join(exp_path, 'missing')) == 0
+    assert find_next_scan(exp_path) == 0
+    for name in ['000000_24-01-01', '000004_24-01-02_label', 'notes', '12_short']:
+        os.mkdir(os.path.join(exp_path, name))
+    # Files are not scans
+    open(os.path.join(exp_path, '000010.txt'), 'w').close()
+    assert find_next_scan(exp_path) == 5
+
+
+def test_find_next_scan_cache(exp_path, monkeypatch):
+    os.mkdir(os.path.join(exp_path, '000001'))
+    assert find_next_scan(exp_path) == 2
+
+    listings = []
+    scandir = os.scandir
+
+    def counting_scandir(path):
+        listings.append(path)
+        return scandir(path)
+
+    monkeypatch.setattr(os, 'scandir', counting_scandir)
+    assert find_next_scan(exp_path) == 2
+    assert listings == []
+
+    # A scan created by another process changes the directory mtime
+    os.mkdir(os.path.join(exp_path, '000007_other'))
+    st = os.stat(exp_path)
+    os.utime(exp_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1000))
+    assert find_next_scan(exp_path) == 8
+    assert listings == [exp_path]
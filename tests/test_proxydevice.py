@@ -0,0 +1,83 @@
+"""
+Tests for the client-side property cache (proxycall cache_ttl).
+"""
+import time
+
+from lclib.proxydevice import ProxyClientBase, _m
+
+
+class FakeRoot:
+    """
+    Server side of the connection: counts property reads.
+    """
+    def __init__(self):
+        self.values = {'live': 1, 'position': 1}
+        self.reads = {'live': 0, 'position': 0}
+
+    def __getattr__(self, name):
+        if name.startswith('_get_'):
+            key = name[5:]
+
+            def get():
+                self.reads[key] += 1
+                return _m({'result': self.values[key]})
+            return get
+        if name.startswith('_set_'):
+            key = name[5:]
+            return lambda value: self.values.__setitem__(key, value)
+        raise AttributeError(name)
+
+
+class FakeConnection:
+    def __init__(self):
+        self.root = FakeRoot()
+
+
+class Client(ProxyClientBase):
+    pass
+
+
+Client._new_property('live', 'cached', cache_ttl=.2)
+Client._new_property('position', 'not cached')
+
+
+def make_client():
+    # Skip __init__, which connects to the server
+    client = Client.__new__(Client)
+    client.stats = {'reply_number': 0,
+                    'total_reply_time': 0.,
+                    'total_reply_time2': 0.,
+                    'min_reply_time': 100.,
+                    'max_reply_time': 0.,
+                    'last_reply_time': 0.}
+    client._property_cache = {}
+    client.conn = FakeConnection()
+    return client
+
+
+def test_cached_property():
+    client = make_client()
+    reads = client.conn.root.reads
+    assert client.live == 1
+    assert client.live == 1
+    assert reads['live'] == 1
+    time.sleep(.3)
+    assert client.live == 1
+    assert reads['live'] == 2
+
+
+def test_uncached_property():
+    client = make_client()
+    client.position
+    client.position
+    assert client.conn.root.reads['position'] == 2
+
+
+def test_setter_clears_cache():
+    client = make_client()
+    assert client.live == 1
+    client.conn.root.values['live'] = 0
+    client.position = 2
+    # Setting any property may change the others
+    assert client.live == 0
+    assert client.conn.root.reads['live'] == 2